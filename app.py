@@ -2,13 +2,20 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-import groq
 import plotly.express as px
-import json
 import numpy as np
+from armazenamento import COLUNAS_TRANSACOES, carregar_reserva_meta, salvar_dados_json, avisos_pendentes
+import compartilhado
+import categorizacao
+import faturamento
+import finbot
+from importacao import importar_extrato
+import rastreamento
+from rastreamento import medir
 
 # --- 1. CONFIGURAÇÃO DA PÁGINA E ESTILOS ---
 st.set_page_config(page_title="Finanças com IA", page_icon="🤖💰", layout="centered", initial_sidebar_state="collapsed")
+rastreamento.iniciar_rerun()
 st.markdown("""
 <style>
     .block-container { padding-top: 1rem; padding-bottom: 2rem; }
@@ -17,86 +24,50 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- 2. FUNÇÕES DE DADOS (COM LÓGICA DE MIGRAÇÃO ROBUSTA) ---
-
-def salvar_dados_csv(df, caminho_arquivo): df.to_csv(caminho_arquivo, index=False)
-def salvar_dados_json(dados, caminho_arquivo):
-    with open(caminho_arquivo, 'w') as f: json.dump(dados, f)
-
-def carregar_transacoes():
-    caminho_arquivo = 'transacoes.csv'
-    colunas_esperadas = ['Data/Hora', 'Descrição', 'Valor', 'Tipo', 'Categoria', 'Subcategoria', 'Descrição da IA']
-    try:
-        df = pd.read_csv(caminho_arquivo)
-        if 'Data' in df.columns and 'Data/Hora' not in df.columns:
-            df.rename(columns={'Data': 'Data/Hora'}, inplace=True)
-        colunas_alteradas = False
-        for col in colunas_esperadas:
-            if col not in df.columns:
-                df[col] = np.nan; colunas_alteradas = True
-        df['Data/Hora'] = pd.to_datetime(df['Data/Hora'], errors='coerce')
-        df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0)
-        if colunas_alteradas: salvar_dados_csv(df, caminho_arquivo)
-        return df
-    except (FileNotFoundError, pd.errors.EmptyDataError):
-        return pd.DataFrame(columns=colunas_esperadas)
-
-def carregar_freelas():
-    caminho_arquivo = 'freelancer_jobs.csv'
-    colunas_esperadas = ['Descrição', 'Status', 'Modo de Cobrança', 'Valor da Hora', 'Valor Fixo', 'Início', 'Término', 'Valor a Receber']
-    try:
-        df = pd.read_csv(caminho_arquivo)
-        for col in colunas_esperadas:
-            if col not in df.columns: df[col] = np.nan
-        df['Início'] = pd.to_datetime(df['Início'], errors='coerce')
-        df['Término'] = pd.to_datetime(df['Término'], errors='coerce')
-        for col in ['Valor da Hora', 'Valor Fixo', 'Valor a Receber']:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        return df
-    except (FileNotFoundError, pd.errors.EmptyDataError):
-        return pd.DataFrame(columns=colunas_esperadas)
-
-def carregar_reserva_movimentacoes():
-    caminho_arquivo = 'reserva_movimentacoes.csv'
-    colunas_esperadas = ['Data', 'Tipo', 'Valor']
-    try:
-        df = pd.read_csv(caminho_arquivo)
-        df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
-        df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0)
-        return df
-    except (FileNotFoundError, pd.errors.EmptyDataError):
-        return pd.DataFrame(columns=colunas_esperadas)
-
-def carregar_reserva_meta():
-    try: return json.load(open('reserva_meta.json', 'r')).get('meta', 1000.0)
-    except (FileNotFoundError, json.JSONDecodeError): return 1000.0
-
-# --- Funções da IA ---
+# --- 2. FUNÇÕES DA IA (os dados ficam em armazenamento.py) ---
 def categorizar_com_ia(descricao):
     if not descricao: return "Outros", "N/A"
     try:
-        client = groq.Client(api_key=st.secrets["GROQ_API_KEY"])
-        chat_completion = client.chat.completions.create(messages=[{"role": "system", "content": 'Você é um assistente financeiro especialista. Responda APENAS com um objeto JSON no formato: {"categoria": "...", "subcategoria": "..."}. Categorias permitidas: Alimentação, Moradia, Transporte, Lazer, Saúde, Educação, Compras, Salário, Investimentos, Outros. Exemplos: "Óculos de sol" -> {"categoria": "Compras", "subcategoria": "Acessórios"}; "Consulta médica" -> {"categoria": "Saúde", "subcategoria": "Médico"}.'}, {"role": "user", "content": f"Classifique a despesa: '{descricao}'"}], model="llama3-70b-8192", temperature=0.0, response_format={"type": "json_object"})
-        response_json = json.loads(chat_completion.choices[0].message.content)
-        return response_json.get("categoria", "Outros"), response_json.get("subcategoria", "N/A")
+        with medir('ia_categorizar'): return categorizacao.categorizar(descricao, st.secrets["GROQ_API_KEY"])
     except Exception as e: st.error(f"Erro ao categorizar: {e}"); return "Outros", "N/A"
 
-def chamar_chatbot_ia(historico_conversa, resumo_financeiro):
-    prompt_sistema = (f"Você é FinBot, um assistente financeiro educativo. Use o seguinte resumo financeiro do usuário para personalizar suas respostas: {resumo_financeiro}. Dê noções gerais sobre investimentos. Sempre inclua um aviso para procurar um profissional e NUNCA se apresente como um conselheiro licenciado.")
-    try:
-        client = groq.Client(api_key=st.secrets["GROQ_API_KEY"])
-        mensagens_para_api = [{"role": "system", "content": prompt_sistema}]
-        mensagens_para_api.extend(historico_conversa)
-        chat_completion = client.chat.completions.create(messages=mensagens_para_api, model="llama3-70b-8192", temperature=0.7)
-        return chat_completion.choices[0].message.content
-    except Exception as e: st.error(f"Erro no chatbot: {e}"); return "Desculpe, estou com um problema para me conectar. Tente novamente."
+def chamar_chatbot_ia(historico_conversa, resumo_financeiro, metricas):
+    try: yield from finbot.responder_em_fluxo(historico_conversa, resumo_financeiro, st.secrets["GROQ_API_KEY"], metricas)
+    except Exception as e: st.error(f"Erro no chatbot: {e}"); yield "Desculpe, estou com um problema para me conectar. Tente novamente."
 
 
 # --- 3. INICIALIZAÇÃO E LÓGICA DE PERÍODO ---
 if 'periodo_selecionado' not in st.session_state: st.session_state.periodo_selecionado = datetime.now()
-if 'transacoes' not in st.session_state: st.session_state.transacoes = carregar_transacoes()
-if 'freelas' not in st.session_state: st.session_state.freelas = carregar_freelas()
-if 'reserva_movimentacoes' not in st.session_state: st.session_state.reserva_movimentacoes = carregar_reserva_movimentacoes()
+# Os DataFrames e o índice são do processo (compartilhado.py); a sessão só guarda a versão que já viu.
+dados_transacoes, dados_freelas, dados_reserva = compartilhado.obter('transacoes'), compartilhado.obter('freelas'), compartilhado.obter('reserva_movimentacoes')
+dados_intervalos = compartilhado.obter('freelas_intervalos')
+with medir('carregar_transacoes'): transacoes, versao_transacoes = dados_transacoes.vista()
+indice = dados_transacoes.indice
+with medir('treinar_classificador'): categorizacao.treinar(transacoes)
+with medir('carregar_freelas'): freelas, versao_freelas = dados_freelas.vista()
+with medir('carregar_freelas_intervalos'): intervalos, _ = dados_intervalos.vista()
+with medir('carregar_reserva_movimentacoes'): reserva_movimentacoes, versao_reserva = dados_reserva.vista()
+if 'versoes' not in st.session_state: st.session_state.versoes = {}
+
+def avisar_mudancas(nome, conjunto, versao, rotulo):
+    """Avisa quando outra sessão gravou no conjunto desde o último rerun desta sessão."""
+    anterior = st.session_state.versoes.get(nome); st.session_state.versoes[nome] = versao
+    if anterior is None or anterior == versao: return
+    meses = conjunto.mudancas_desde(anterior)
+    if meses is None: st.toast(f"{rotulo}: dados atualizados por outra sessão.")
+    elif meses: st.toast(f"{rotulo} atualizados por outra sessão em " + ", ".join(f"{mes:02d}/{ano}" for ano, mes in sorted(meses)))
+
+def marcar_gravacao(nome, conjunto):
+    """Depois de uma gravação desta sessão: não avisar sobre ela no próximo rerun."""
+    st.session_state.versoes[nome] = conjunto.versao
+
+def reiniciar():
+    """st.rerun() interrompe o script: registra os tempos deste rerun antes."""
+    rastreamento.finalizar_rerun(compartilhado.dataframes()); st.rerun()
+
+avisar_mudancas('transacoes', dados_transacoes, versao_transacoes, "Lançamentos")
+avisar_mudancas('freelas', dados_freelas, versao_freelas, "Trabalhos")
+avisar_mudancas('reserva_movimentacoes', dados_reserva, versao_reserva, "Movimentações da reserva")
 if 'reserva_meta' not in st.session_state: st.session_state.reserva_meta = carregar_reserva_meta()
 if 'sugestoes' not in st.session_state: st.session_state.sugestoes = {"categoria": "", "subcategoria": ""}
 if "messages" not in st.session_state: st.session_state.messages = [{"role": "assistant", "content": "Olá! Sou o FinBot. Como posso ajudar?"}]
@@ -104,17 +75,30 @@ if "messages" not in st.session_state: st.session_state.messages = [{"role": "as
 def exibir_navegador_mes(contexto):
     col1, col2, col3 = st.columns([1, 4, 1])
     if col1.button("⬅️", use_container_width=True, help="Mês Anterior", key=f"prev_{contexto}"):
-        st.session_state.periodo_selecionado -= relativedelta(months=1); st.rerun()
+        st.session_state.periodo_selecionado -= relativedelta(months=1); reiniciar()
     mes_ano_str = st.session_state.periodo_selecionado.strftime("%B de %Y").capitalize()
     col2.subheader(mes_ano_str)
     if col3.button("➡️", use_container_width=True, help="Próximo Mês", key=f"next_{contexto}"):
-        st.session_state.periodo_selecionado += relativedelta(months=1); st.rerun()
+        st.session_state.periodo_selecionado += relativedelta(months=1); reiniciar()
+
+def formatar_historico(df):
+    """Formata uma página do histórico de uma vez (sem loop por linha) para exibição em st.dataframe."""
+    receita = (df['Tipo'] == 'Receita').to_numpy()
+    categoria = df['Categoria'].astype(object).where(df['Categoria'].notna(), 'N/A').astype(str)
+    subcategoria = df['Subcategoria'].astype(object).where(df['Subcategoria'].notna() & (df['Subcategoria'].astype(str) != ''), 'N/A').astype(str)
+    valores = df['Valor'].map('{:,.2f}'.format) if len(df) else df['Valor'].astype(str)
+    return pd.DataFrame({'': np.where(receita, '🟢', '🔴'), 'Descrição': df['Descrição'].astype(str), 'Categoria': categoria + ' > ' + subcategoria,
+                         'Valor': np.where(receita, '+ R$ ', '- R$ ') + valores.to_numpy(dtype=str),
+                         'Data': df['Data/Hora'].dt.strftime('%d/%m/%Y às %H:%M').fillna('')}, index=df.index)
 
 # --- 4. INTERFACE PRINCIPAL ---
 st.title("🤖 Finanças & Freelas com IA")
-tab_lancamento, tab_historico, tab_freelancer, tab_reserva, tab_ia = st.tabs(["✍️ Lançar", "📊 Histórico", "💻 Freelancer", "🛡️ Reserva", "🤖 Análise IA"])
+for aviso in avisos_pendentes(): st.warning(aviso, icon="⚠️")
+mostrar_diagnostico = st.query_params.get("diag") == "1"  # aba oculta: abra o app com ?diag=1
+abas = st.tabs(["✍️ Lançar", "📊 Histórico", "💻 Freelancer", "🛡️ Reserva", "🤖 Análise IA"] + (["🩺 Diagnóstico"] if mostrar_diagnostico else []))
+tab_lancamento, tab_historico, tab_freelancer, tab_reserva, tab_ia = abas[:5]
 
-with tab_lancamento:
+with tab_lancamento, medir('aba_lancamento'):
     st.header("Adicionar Nova Transação")
     with st.form("nova_transacao_form"):
         descricao = st.text_input("Descrição", placeholder="Ex: Óculos de sol novos")
@@ -126,7 +110,9 @@ with tab_lancamento:
                 cat, subcat = categorizar_com_ia(descricao)
                 st.session_state.sugestoes = {"categoria": cat, "subcategoria": subcat}
         st.info(f"Sugestão da IA: Categoria '{st.session_state.sugestoes.get('categoria', 'N/A')}', Subcategoria '{st.session_state.sugestoes.get('subcategoria', 'N/A')}'")
-        categorias_disponiveis = ["Alimentação", "Moradia", "Transporte", "Lazer", "Saúde", "Educação", "Compras", "Salário", "Investimentos", "Outros"]
+        estatisticas_ia = categorizacao.estatisticas()
+        st.caption(f"Cache de categorias: {estatisticas_ia['acertos']} acertos · {estatisticas_ia['falhas']} consultas à IA · {estatisticas_ia['erros']} erros")
+        categorias_disponiveis = categorizacao.CATEGORIAS
         try: index_cat = categorias_disponiveis.index(st.session_state.sugestoes['categoria'])
         except (ValueError, KeyError): index_cat = 0
         col_cat, col_sub = st.columns(2)
@@ -135,57 +121,74 @@ with tab_lancamento:
         if st.form_submit_button("✅ Salvar Transação"):
             if not descricao or valor <= 0: st.warning("Por favor, preencha a descrição e o valor.")
             else:
-                nova_transacao = pd.DataFrame([[datetime.now(), descricao, valor, tipo, categoria_final, subcategoria_final, f"{st.session_state.sugestoes.get('categoria', 'N/A')} -> {st.session_state.sugestoes.get('subcategoria', 'N/A')}" ]], columns=['Data/Hora', 'Descrição', 'Valor', 'Tipo', 'Categoria', 'Subcategoria', 'Descrição da IA'])
-                st.session_state.transacoes = pd.concat([st.session_state.transacoes, nova_transacao], ignore_index=True)
-                salvar_dados_csv(st.session_state.transacoes, 'transacoes.csv')
-                st.success("Transação salva com sucesso!"); st.session_state.sugestoes = {"categoria": "", "subcategoria": ""}; st.rerun()
+                nova_transacao = pd.DataFrame([[datetime.now(), descricao, valor, tipo, categoria_final, subcategoria_final, f"{st.session_state.sugestoes.get('categoria', 'N/A')} -> {st.session_state.sugestoes.get('subcategoria', 'N/A')}" ]], columns=COLUNAS_TRANSACOES)
+                with medir('gravar_transacao'): dados_transacoes.inserir(nova_transacao)
+                marcar_gravacao('transacoes', dados_transacoes)
+                categorizacao.aprender(descricao, categoria_final, subcategoria_final or 'N/A')
+                st.success("Transação salva com sucesso!"); st.session_state.sugestoes = {"categoria": "", "subcategoria": ""}; reiniciar()
+    with st.expander("📥 Importar Extrato Bancário (CSV/OFX)", expanded='resumo_importacao' in st.session_state):
+        if (resumo := st.session_state.pop('resumo_importacao', None)) is not None:  # resultado da importação do rerun anterior
+            st.success(f"{resumo['importadas']} lançamentos importados, {resumo['duplicadas']} duplicados ignorados.")
+            if resumo['descartadas']: st.warning(f"{resumo['descartadas']} de {resumo['lidas']} linha(s) do extrato foram descartadas por data ou valor ilegível.")
+            if resumo['lotes_com_falha']: st.warning(f"{resumo['lotes_com_falha']} lote(s) não puderam ser categorizados pela IA e ficaram como 'Outros'.")
+        arquivo_extrato = st.file_uploader("Extrato exportado pelo banco", type=['csv', 'ofx'])
+        if arquivo_extrato is not None and st.button("Importar Lançamentos"):
+            with st.spinner("Importando e categorizando os lançamentos... ⏳"), medir('importar_extrato'):
+                try:
+                    _, resumo = importar_extrato(dados_transacoes, arquivo_extrato.getvalue(), arquivo_extrato.name, st.secrets["GROQ_API_KEY"])
+                except ValueError as e: st.error(f"Não foi possível ler o extrato: {e}")
+                else:
+                    marcar_gravacao('transacoes', dados_transacoes)
+                    st.session_state.resumo_importacao = resumo; reiniciar()
 
 # --- Lógica de Filtragem ---
 periodo = st.session_state.periodo_selecionado
-df_transacoes = st.session_state.transacoes.copy()
-df_transacoes['Data/Hora'] = pd.to_datetime(df_transacoes['Data/Hora'], errors='coerce') # Guarda de Tipo
-transacoes_filtradas = df_transacoes.dropna(subset=['Data/Hora'])
-transacoes_filtradas = transacoes_filtradas[(transacoes_filtradas['Data/Hora'].dt.year == periodo.year) & (transacoes_filtradas['Data/Hora'].dt.month == periodo.month)]
+with medir('filtro_mes'):
+    transacoes_filtradas = indice.linhas_mes(transacoes, periodo.year, periodo.month) # O(linhas do mês)
+    totais_mes = indice.totais_mes(periodo.year, periodo.month)
+with medir('faturamento_freelas'):
+    agora = datetime.now()
+    faturamento_trabalhos = faturamento.calcular(freelas, intervalos, agora)  # horas e valor acumulado de cada trabalho
+    ganhos_freelas = faturamento.receita_mensal(freelas, intervalos, agora)
+    ganhos_freelas_mes = faturamento.ganhos_mes(ganhos_freelas, periodo.year, periodo.month)
 
-with tab_historico:
+with tab_historico, medir('aba_historico'):
     exibir_navegador_mes(contexto="historico")
     st.header("Resumo Financeiro do Mês")
-    total_receitas = transacoes_filtradas[transacoes_filtradas['Tipo'] == 'Receita']['Valor'].sum()
-    total_despesas = transacoes_filtradas[transacoes_filtradas['Tipo'] == 'Despesa']['Valor'].sum()
-    col1, col2, col3 = st.columns(3)
+    total_receitas = totais_mes['Receita']; total_despesas = totais_mes['Despesa']
+    col1, col2, col3, col4 = st.columns(4)
     col1.metric("Receitas", f"R${total_receitas:,.2f}"); col2.metric("Despesas", f"R${total_despesas:,.2f}"); col3.metric("Saldo", f"R${total_receitas - total_despesas:,.2f}")
+    col4.metric("Freelas", f"R${ganhos_freelas_mes['Valor']:,.2f}", help=f"{ganhos_freelas_mes['Horas']:.1f} h trabalhadas no mês; projetos de valor fixo contam no mês do término.")
+    with st.expander("📈 Tendência dos Últimos 6 Meses"):
+        with medir('grafico_tendencia'):
+            tendencia = indice.tendencia(periodo.year, periodo.month)
+            st.plotly_chart(px.bar(tendencia, x='Mês', y=['Receita', 'Despesa'], barmode='group'), use_container_width=True)
     st.header("Transações do Mês")
     if transacoes_filtradas.empty:
         st.info("Nenhuma transação registrada neste mês.")
     else:
-        for index, row in transacoes_filtradas.sort_values(by="Data/Hora", ascending=False).iterrows():
-            with st.container(border=True):
-                col1, col2, col3, col4 = st.columns([4, 2, 2, 1])
-                with col1:
-                    st.write(f"**{row['Descrição']}**")
-                    st.caption(f"{row.get('Categoria', 'N/A')} > {row.get('Subcategoria', 'N/A')}")
-                with col2:
-                    valor_formatado = f"R$ {row.get('Valor', 0):.2f}"
-                    if row['Tipo'] == 'Receita': st.markdown(f"<p style='color:green; font-weight:bold;'>{valor_formatado}</p>", unsafe_allow_html=True)
-                    else: st.markdown(f"<p style='color:red; font-weight:bold;'>{valor_formatado}</p>", unsafe_allow_html=True)
-                with col3:
-                    if pd.notna(row['Data/Hora']): st.write(f"_{row['Data/Hora'].strftime('%d/%m/%Y às %H:%M')}_")
-                with col4:
-                    if st.button("🗑️", key=f"delete_{index}", help="Excluir este lançamento"):
-                        st.session_state.transacoes.drop(index, inplace=True)
-                        salvar_dados_csv(st.session_state.transacoes, 'transacoes.csv')
-                        st.success(f"Lançamento '{row['Descrição']}' excluído!"); st.rerun()
+        # Um único st.dataframe por página (grade virtualizada) em vez de um container com 4 colunas e um botão por linha.
+        ordenadas = transacoes_filtradas.sort_values(by="Data/Hora", ascending=False)
+        col_tamanho, col_pagina = st.columns(2)
+        tamanho_pagina = col_tamanho.selectbox("Lançamentos por página", [25, 50, 100, 250], key="tamanho_pagina_historico")
+        total_paginas = max(1, -(-len(ordenadas) // tamanho_pagina))
+        pagina = col_pagina.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, value=1, step=1, key=f"pagina_historico_{periodo.year}_{periodo.month}_{tamanho_pagina}")
+        pagina_atual = ordenadas.iloc[(pagina - 1) * tamanho_pagina: pagina * tamanho_pagina]
+        with medir('historico_formatar'): tabela_pagina = formatar_historico(pagina_atual)
+        selecao = st.dataframe(tabela_pagina, hide_index=True, use_container_width=True, on_select="rerun", selection_mode="multi-row",
+                               key=f"tabela_historico_{periodo.year}_{periodo.month}_{pagina}_{tamanho_pagina}")
+        ids_selecionados = pagina_atual.index[selecao.selection.rows].tolist()
+        if st.button(f"🗑️ Excluir selecionados ({len(ids_selecionados)})", disabled=not ids_selecionados, help="Selecione as linhas na tabela"):
+            with medir('excluir_transacoes'): excluidos = dados_transacoes.excluir(ids_selecionados)
+            marcar_gravacao('transacoes', dados_transacoes)
+            st.success(f"{excluidos} lançamento(s) excluído(s)!"); reiniciar()
 
-with tab_freelancer:
+with tab_freelancer, medir('aba_freelancer'):
     exibir_navegador_mes(contexto="freelancer")
     st.header("Gestor de Trabalhos Freelancer")
-    df_freelas = st.session_state.freelas.copy()
-    
-    # AQUI ESTÁ A CORREÇÃO PRINCIPAL
-    df_freelas['Término'] = pd.to_datetime(df_freelas['Término'], errors='coerce')
-    df_freelas_concluidos_validos = df_freelas.dropna(subset=['Término'])
-    freelas_concluidos_filtrados = df_freelas_concluidos_validos[(df_freelas_concluidos_validos['Status'] == 'Concluído') & (df_freelas_concluidos_validos['Término'].dt.year == periodo.year) & (df_freelas_concluidos_validos['Término'].dt.month == periodo.month)]
-    
+    termino = pd.to_datetime(freelas['Término'], errors='coerce')
+    freelas_concluidos_filtrados = freelas[(freelas['Status'] == faturamento.CONCLUIDO) & (termino.dt.year == periodo.year) & (termino.dt.month == periodo.month)]
+
     with st.expander("➕ Registrar Novo Trabalho"):
         with st.form("novo_freela_form", clear_on_submit=True):
             freela_descricao = st.text_input("Descrição do Trabalho", placeholder="Ex: Site para Padaria do Bairro")
@@ -194,41 +197,41 @@ with tab_freelancer:
             if modo_cobranca == "Valor por Hora": valor_hora = st.number_input("Seu valor por hora (R$)", min_value=1.0, format="%.2f")
             else: valor_fixo = st.number_input("Valor fixo do projeto (R$)", min_value=1.0, format="%.2f")
             if st.form_submit_button("🚀 Iniciar Trabalho"):
-                novo_freela = {'Descrição': freela_descricao, 'Status': 'Em Andamento', 'Modo de Cobrança': modo_cobranca, 'Valor da Hora': valor_hora, 'Valor Fixo': valor_fixo, 'Início': datetime.now(), 'Término': pd.NaT, 'Valor a Receber': 0.0}
-                st.session_state.freelas = pd.concat([st.session_state.freelas, pd.DataFrame([novo_freela])], ignore_index=True)
-                salvar_dados_csv(st.session_state.freelas, 'freelancer_jobs.csv')
-                st.success(f"Trabalho '{freela_descricao}' iniciado!"); st.rerun()
+                with medir('iniciar_freela'): faturamento.iniciar(dados_freelas, dados_intervalos, {'Descrição': freela_descricao, 'Modo de Cobrança': modo_cobranca, 'Valor da Hora': valor_hora, 'Valor Fixo': valor_fixo}, datetime.now())
+                marcar_gravacao('freelas', dados_freelas)
+                st.success(f"Trabalho '{freela_descricao}' iniciado!"); reiniciar()
     st.divider()
     st.subheader("Em Andamento")
-    trabalhos_andamento = st.session_state.freelas[st.session_state.freelas['Status'] == 'Em Andamento'].copy()
-    trabalhos_andamento['Início'] = pd.to_datetime(trabalhos_andamento['Início'], errors='coerce')
-    if trabalhos_andamento.empty: st.info("Nenhum trabalho em andamento.")
+    trabalhos_ativos = freelas[freelas['Status'].isin(faturamento.ATIVOS)]
+    if trabalhos_ativos.empty: st.info("Nenhum trabalho em andamento.")
     else:
-        for idx, job in trabalhos_andamento.iterrows():
-            with st.container(border=True):
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"**{job['Descrição']}**")
-                    if pd.notna(job['Início']): st.write(f"Iniciado em: {job['Início'].strftime('%d/%m/%Y às %H:%M')}")
-                    st.write(f"Cobrança: R$ {job.get('Valor da Hora', 0):.2f}/hora" if job.get('Modo de Cobrança') == 'Valor por Hora' else f"Cobrança: R$ {job.get('Valor Fixo', 0):.2f} (valor fixo)")
-                with col2:
-                    if st.button("🏁 Finalizar", key=f"finalizar_{idx}"):
-                        termino = datetime.now(); valor_final = 0.0
-                        if job['Modo de Cobrança'] == 'Valor por Hora':
-                            duracao = termino - job['Início']; horas = duracao.total_seconds() / 3600
-                            valor_final = horas * job['Valor da Hora']
-                        else: valor_final = job['Valor Fixo']
-                        st.session_state.freelas.at[idx, 'Status'] = 'Concluído'; st.session_state.freelas.at[idx, 'Término'] = termino
-                        st.session_state.freelas.at[idx, 'Valor a Receber'] = valor_final
-                        salvar_dados_csv(st.session_state.freelas, 'freelancer_jobs.csv')
-                        st.success("Trabalho finalizado!"); st.rerun()
+        # Uma tabela com horas e valor acumulado de todos os trabalhos ativos; as ações valem para as linhas selecionadas.
+        with medir('freelas_em_andamento'):
+            por_hora = (trabalhos_ativos['Modo de Cobrança'] == faturamento.POR_HORA).to_numpy()
+            acumulado = faturamento_trabalhos.loc[trabalhos_ativos.index]
+            tabela_ativos = pd.DataFrame({'': np.where(trabalhos_ativos['Status'] == faturamento.PAUSADO, '⏸️', '▶️'), 'Trabalho': trabalhos_ativos['Descrição'].astype(str),
+                                          'Cobrança': np.where(por_hora, trabalhos_ativos['Valor da Hora'].map('R$ {:,.2f}/hora'.format).to_numpy(dtype=str), trabalhos_ativos['Valor Fixo'].map('R$ {:,.2f} (fixo)'.format).to_numpy(dtype=str)),
+                                          'Iniciado em': trabalhos_ativos['Início'].dt.strftime('%d/%m/%Y às %H:%M').fillna(''), 'Horas': acumulado['Horas'].round(2), 'Acumulado (R$)': acumulado['Valor Acumulado'].round(2)}, index=trabalhos_ativos.index)
+            selecao_freelas = st.dataframe(tabela_ativos, hide_index=True, use_container_width=True, on_select="rerun", selection_mode="multi-row", key="tabela_freelas_ativos")
+        ids_freelas = trabalhos_ativos.index[selecao_freelas.selection.rows].tolist()
+        col_pausar, col_retomar, col_finalizar = st.columns(3)
+        acoes = [(col_pausar, "⏸️ Pausar", faturamento.pausar, "pausado(s)"), (col_retomar, "▶️ Retomar", faturamento.retomar, "retomado(s)"), (col_finalizar, "🏁 Finalizar", faturamento.finalizar, "finalizado(s)")]
+        for coluna, rotulo, acao, verbo in acoes:
+            if coluna.button(rotulo, disabled=not ids_freelas, use_container_width=True, help="Selecione os trabalhos na tabela"):
+                with medir(f'{acao.__name__}_freelas'): feitos = acao(dados_freelas, dados_intervalos, ids_freelas, datetime.now())
+                marcar_gravacao('freelas', dados_freelas)
+                if len(feitos) < len(ids_freelas): st.warning(f"{len(ids_freelas) - len(feitos)} trabalho(s) não estavam nesse estado (talvez alterados em outra sessão).")
+                st.success(f"{len(feitos)} trabalho(s) {verbo}!"); reiniciar()
+    with st.expander("📈 Ganhos com Freelas nos Últimos 6 Meses"):
+        ganhos_tendencia = faturamento.tendencia(ganhos_freelas, periodo.year, periodo.month)
+        st.plotly_chart(px.bar(ganhos_tendencia, x='Mês', y='Valor', hover_data=['Horas']), use_container_width=True)
     st.divider()
     st.subheader("Histórico de Trabalhos Concluídos no Mês")
-    st.data_editor(freelas_concluidos_filtrados, use_container_width=True, hide_index=True)
+    st.data_editor(freelas_concluidos_filtrados.assign(Horas=faturamento_trabalhos['Horas'].reindex(freelas_concluidos_filtrados.index).round(2)), use_container_width=True, hide_index=True)
 
-with tab_reserva:
+with tab_reserva, medir('aba_reserva'):
     st.header("🛡️ Reserva de Emergência")
-    movimentacoes = st.session_state.reserva_movimentacoes.copy()
+    movimentacoes = reserva_movimentacoes
     valor_atual = movimentacoes[movimentacoes['Tipo'] == 'Aporte']['Valor'].sum() - movimentacoes[movimentacoes['Tipo'] == 'Retirada']['Valor'].sum()
     meta_reserva = st.session_state.reserva_meta
     percentual_calculado = (valor_atual / meta_reserva) if meta_reserva > 0 else 0.0
@@ -242,37 +245,36 @@ with tab_reserva:
             col_btn1, col_btn2 = st.columns(2)
             if col_btn1.form_submit_button("Adicionar Aporte 💵"):
                 nova_mov = {'Data': datetime.now(), 'Tipo': 'Aporte', 'Valor': valor_movimentacao}
-                st.session_state.reserva_movimentacoes = pd.concat([st.session_state.reserva_movimentacoes, pd.DataFrame([nova_mov])], ignore_index=True)
-                salvar_dados_csv(st.session_state.reserva_movimentacoes, 'reserva_movimentacoes.csv')
-                st.success("Aporte registrado!"); st.rerun()
+                with medir('gravar_reserva'): dados_reserva.inserir(pd.DataFrame([nova_mov]))
+                marcar_gravacao('reserva_movimentacoes', dados_reserva)
+                st.success("Aporte registrado!"); reiniciar()
             if col_btn2.form_submit_button("Realizar Retirada 🆘"):
                 if valor_movimentacao > valor_atual: st.error("Valor da retirada maior que o saldo atual!")
                 else:
                     nova_mov = {'Data': datetime.now(), 'Tipo': 'Retirada', 'Valor': valor_movimentacao}
-                    st.session_state.reserva_movimentacoes = pd.concat([st.session_state.reserva_movimentacoes, pd.DataFrame([nova_mov])], ignore_index=True)
-                    salvar_dados_csv(st.session_state.reserva_movimentacoes, 'reserva_movimentacoes.csv')
-                    st.warning("Retirada registrada!"); st.rerun()
+                    with medir('gravar_reserva'): dados_reserva.inserir(pd.DataFrame([nova_mov]))
+                    marcar_gravacao('reserva_movimentacoes', dados_reserva)
+                    st.warning("Retirada registrada!"); reiniciar()
     with st.expander("⚙️ Configurar Meta da Reserva"):
         nova_meta = st.number_input("Defina o valor total da sua reserva de emergência", min_value=1.0, value=meta_reserva, format="%.2f")
         if st.button("Salvar Nova Meta"):
             st.session_state.reserva_meta = nova_meta
-            salvar_dados_json({'meta': nova_meta}, 'reserva_meta.json')
-            st.success("Nova meta salva com sucesso!"); st.rerun()
+            with medir('gravar_meta'): salvar_dados_json({'meta': nova_meta}, 'reserva_meta.json')
+            st.success("Nova meta salva com sucesso!"); reiniciar()
     st.divider()
     st.subheader("Histórico Geral de Movimentações da Reserva")
-    st.data_editor(st.session_state.reserva_movimentacoes.sort_values(by="Data", ascending=False), use_container_width=True, hide_index=True)
+    with medir('reserva_historico'): st.data_editor(reserva_movimentacoes.sort_values(by="Data", ascending=False), use_container_width=True, hide_index=True)
 
-with tab_ia:
+with tab_ia, medir('aba_ia'):
     exibir_navegador_mes(contexto="ia")
     st.header("Análise de Gastos do Mês")
-    despesas_filtradas = transacoes_filtradas[transacoes_filtradas['Tipo'] == 'Despesa']
-    if not despesas_filtradas.empty:
-        df_para_grafico = despesas_filtradas.copy()
-        df_para_grafico['Subcategoria'].replace(['', 'N/A'], np.nan, inplace=True)
-        df_para_grafico.dropna(subset=['Categoria', 'Subcategoria'], inplace=True)
+    despesas_por_categoria = indice.por_categoria(periodo.year, periodo.month, 'Despesa')
+    if not despesas_por_categoria.empty:
+        df_para_grafico = despesas_por_categoria[(despesas_por_categoria['Categoria'] != '') & ~despesas_por_categoria['Subcategoria'].isin(['', 'N/A'])]
         if not df_para_grafico.empty:
-            fig = px.sunburst(df_para_grafico, path=['Categoria', 'Subcategoria'], values='Valor')
-            st.plotly_chart(fig, use_container_width=True)
+            with medir('grafico_sunburst'):
+                fig = px.sunburst(df_para_grafico, path=['Categoria', 'Subcategoria'], values='Valor')
+                st.plotly_chart(fig, use_container_width=True)
         else: st.info("Não há dados com Categoria e Subcategoria detalhadas para analisar neste mês.")
     else: st.info("Não há despesas neste mês para analisar.")
     st.divider()
@@ -286,9 +288,24 @@ with tab_ia:
             with st.chat_message("user"):
                 st.markdown(prompt)
             with st.chat_message("assistant"):
-                with st.spinner("FinBot está pensando..."):
-                    receitas_mes = transacoes_filtradas[transacoes_filtradas['Tipo'] == 'Receita']['Valor'].sum()
-                    resumo_financeiro_atual = f"Receita no mês de {st.session_state.periodo_selecionado.strftime('%B')}: R${receitas_mes:,.2f}"
-                    resposta = chamar_chatbot_ia(st.session_state.messages, resumo_financeiro_atual)
-                    st.markdown(resposta)
+                resumo_financeiro_atual = finbot.resumo_financeiro(indice, periodo.year, periodo.month, periodo.strftime('%B'))
+                metricas_chat = {}
+                with medir('ia_chatbot'): resposta = st.write_stream(chamar_chatbot_ia(st.session_state.messages, resumo_financeiro_atual, metricas_chat))
+                if 'ttft_ms' in metricas_chat:
+                    st.caption(f"1º token em {metricas_chat['ttft_ms']:.0f} ms · resposta em {metricas_chat['total_ms']:.0f} ms · prompt ~{metricas_chat['tokens_prompt']} tokens ({metricas_chat['mensagens_enviadas']} mensagens)")
             st.session_state.messages.append({"role": "assistant", "content": resposta})
+
+if mostrar_diagnostico:
+    with abas[5]:
+        st.header("🩺 Diagnóstico de Desempenho")
+        st.caption(f"Tempos por trecho nos últimos {rastreamento.RERUNS_GUARDADOS} reruns deste processo (log em {rastreamento.CAMINHO_LOG}).")
+        st.dataframe(rastreamento.resumo(), hide_index=True, use_container_width=True)
+        memoria, momento = rastreamento.ultima_memoria()
+        if memoria:
+            st.subheader("Memória dos DataFrames Compartilhados")
+            st.caption(f"Uma cópia por processo, qualquer que seja o número de sessões. Medição completa (deep) de {momento}.")
+            st.dataframe(pd.DataFrame({'DataFrame': list(memoria), 'MB': [v / 1e6 for v in memoria.values()]}).round(3), hide_index=True, use_container_width=True)
+        st.subheader("Categorização")
+        st.json(categorizacao.estatisticas())
+
+rastreamento.finalizar_rerun(compartilhado.dataframes())
@@ -0,0 +1,456 @@
+import io
+import json
+import logging
+import os
+import threading
+import uuid
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # opcional: sem pyarrow o snapshot continua em CSV
+    pa = pq = None
+
+# --- ARMAZENAMENTO: SNAPSHOT + DIÁRIO APPEND-ONLY ---
+# Cada conjunto de dados é um snapshot (o CSV de sempre, mesmo esquema de colunas) mais um
+# diário "<arquivo>.diario" em JSON lines. Inclusões, exclusões (lápides) e alterações são
+# apenas anexadas ao diário; a carga lê o snapshot e reaplica o diário. Quando o diário cresce,
+# uma compactação em segundo plano reescreve o snapshot e recomeça o diário.
+#
+# Os ids das linhas são estáveis: o índice do DataFrame carregado é o id usado no diário.
+# A primeira linha do diário ("base") guarda o CRC do snapshot a que ele se aplica e os ids
+# das linhas do snapshot (em faixas), para que a compactação nunca renumere nada.
+#
+# Com FINANCAS_FORMATO=parquet (e pyarrow instalado) o snapshot passa a ser "<nome>.parquet": colunas
+# de baixa cardinalidade como dicionário, datas em datetime64, valores em centavos inteiros e leitura
+# só das colunas pedidas, via memory map. Na primeira carga o CSV (com seu diário) é migrado uma vez
+# e renomeado para "*.migrado".
+
+COLUNAS_TRANSACOES = ['Data/Hora', 'Descrição', 'Valor', 'Tipo', 'Categoria', 'Subcategoria', 'Descrição da IA']
+COLUNAS_FREELAS = ['Descrição', 'Status', 'Modo de Cobrança', 'Valor da Hora', 'Valor Fixo', 'Início', 'Término', 'Valor a Receber']
+COLUNAS_RESERVA = ['Data', 'Tipo', 'Valor']
+COLUNAS_INTERVALOS = ['Trabalho', 'Início', 'Fim']  # períodos trabalhados de cada freela (Fim vazio = em curso)
+
+COLUNAS_DATAS = ['Data/Hora', 'Data', 'Início', 'Término', 'Fim']
+COLUNAS_CATEGORICAS = ['Tipo', 'Categoria', 'Subcategoria', 'Status', 'Modo de Cobrança']
+COLUNAS_MONETARIAS = ['Valor', 'Valor da Hora', 'Valor Fixo', 'Valor a Receber']  # gravadas em centavos no Parquet
+
+LIMITE_COMPACTACAO = 500  # registros no diário antes de disparar a compactação
+FORMATO = os.environ.get('FINANCAS_FORMATO', 'csv').lower()
+if FORMATO == 'parquet' and pq is None: FORMATO = 'csv'
+
+_log = logging.getLogger(__name__)
+
+
+def _valor_json(valor):
+    if valor is None or valor is pd.NaT: return None
+    if isinstance(valor, (float, np.floating)) and np.isnan(valor): return None
+    if isinstance(valor, (pd.Timestamp, datetime)): return str(valor)
+    if isinstance(valor, np.generic): return valor.item()
+    return valor
+
+def _faixas(ids):
+    """Codifica uma sequência de ids como [[início, tamanho], ...] de trechos consecutivos."""
+    faixas = []
+    for i in ids:
+        if faixas and faixas[-1][0] + faixas[-1][1] == i: faixas[-1][1] += 1
+        else: faixas.append([int(i), 1])
+    return faixas
+
+def _expandir_faixas(faixas, total):
+    if not faixas: return pd.RangeIndex(total)
+    ids = np.concatenate([np.arange(inicio, inicio + tamanho) for inicio, tamanho in faixas])
+    return pd.Index(ids) if len(ids) == total else pd.RangeIndex(total)
+
+def _ler_bytes(caminho):
+    try:
+        with open(caminho, 'rb') as f: return f.read()
+    except FileNotFoundError: return b''
+
+def _gravar_atomico(caminho, dados):
+    with open(caminho, 'wb') as f:
+        f.write(dados); f.flush(); os.fsync(f.fileno())
+
+def _sincronizar(caminho):
+    with open(caminho, 'rb') as f: os.fsync(f.fileno())
+
+
+# --- Formatos de snapshot: ler(colunas) -> (df, assinatura); a assinatura identifica o arquivo no cabeçalho do diário ---
+class SnapshotCSV:
+    def __init__(self, caminho, colunas): self.caminho, self.colunas = caminho, colunas
+
+    def ler(self, colunas=None):
+        dados = _ler_bytes(self.caminho)
+        usecols = None if colunas is None else (lambda col: col in colunas)
+        try: df = pd.read_csv(io.BytesIO(dados), usecols=usecols) if dados.strip() else pd.DataFrame(columns=self.colunas)
+        except pd.errors.EmptyDataError: df = pd.DataFrame(columns=self.colunas)
+        return df, zlib.crc32(dados)
+
+    def assinatura(self): return zlib.crc32(_ler_bytes(self.caminho))
+
+    def gravar(self, df, destino):
+        dados = df.to_csv(index=False).encode('utf-8')
+        _gravar_atomico(destino, dados)
+        return zlib.crc32(dados)
+
+
+class SnapshotParquet:
+    def __init__(self, caminho, colunas): self.caminho, self.colunas = caminho, colunas
+
+    def ler(self, colunas=None):
+        if not os.path.exists(self.caminho): return pd.DataFrame(columns=self.colunas if colunas is None else colunas), 0
+        esquema = pq.read_schema(self.caminho)
+        nomes = [c for c in esquema.names if colunas is None or c in colunas]
+        df = pd.read_parquet(self.caminho, columns=nomes, memory_map=True)
+        for col in df.columns.intersection(COLUNAS_MONETARIAS):
+            df[col] = df[col].to_numpy(dtype='float64', na_value=np.nan) / 100
+        return df, (esquema.metadata or {}).get(b'diario', b'').decode()
+
+    def assinatura(self):
+        try: return (pq.read_schema(self.caminho).metadata or {}).get(b'diario', b'').decode()
+        except FileNotFoundError: return 0
+
+    def gravar(self, df, destino):
+        assinatura = uuid.uuid4().hex
+        df = df.reset_index(drop=True)
+        for col in df.columns.intersection(COLUNAS_MONETARIAS):
+            df[col] = pd.to_numeric(df[col], errors='coerce').mul(100).round().astype('Int64')
+        for col in df.columns.intersection(COLUNAS_CATEGORICAS):
+            if not isinstance(df[col].dtype, pd.CategoricalDtype): df[col] = df[col].astype('category')
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), b'diario': assinatura.encode()})
+        pq.write_table(tabela, destino)
+        _sincronizar(destino)
+        return assinatura
+
+
+class Diario:
+    def __init__(self, caminho, colunas, formato='csv'):
+        self.formato = formato
+        self.caminho_csv = caminho
+        self.caminho = caminho if formato == 'csv' else os.path.splitext(caminho)[0] + '.parquet'
+        self.caminho_diario = self.caminho + '.diario'
+        self.colunas = colunas
+        self._snapshot = (SnapshotCSV if formato == 'csv' else SnapshotParquet)(self.caminho, colunas)
+        self._legado = None  # Diario CSV em migração para Parquet
+        self.compactacao_automatica = True
+        self._trava = threading.RLock()             # protege os anexos ao diário
+        self._trava_compactacao = threading.Lock()  # só uma reescrita do snapshot por vez
+        self._crc = None
+        self._proximo_id = 0
+        self._registros = 0
+        self.avisos = []  # mensagens para o usuário (ver avisos_pendentes)
+        self._compactacao_agendada = False
+        self._adiar_compactacao = 0  # depois de uma falha, espera mais LIMITE_COMPACTACAO registros para tentar de novo
+
+    # --- Leitura ---
+    def _ler_diario(self, limite=None):
+        """Retorna (cabeçalho, registros, posição do último byte válido)."""
+        dados = _ler_bytes(self.caminho_diario)
+        if limite is not None: dados = dados[:limite]
+        cabecalho, registros, posicao = None, [], 0
+        for linha in dados.splitlines(keepends=True):
+            if not linha.endswith(b'\n'): break  # última linha cortada por uma queda no meio da escrita
+            try: registro = json.loads(linha)
+            except json.JSONDecodeError: break
+            posicao += len(linha)
+            if registro.get('op') == 'base' and cabecalho is None and not registros: cabecalho = registro
+            else: registros.append(registro)
+        return cabecalho, registros, posicao
+
+    def _reaplicar(self, df, registros):
+        novas, excluidos, alteracoes = {}, set(), {}
+        for registro in registros:
+            op = registro.get('op')
+            if op == 'ins':
+                for id_, linha in zip(registro['ids'], registro['linhas']): novas[id_] = linha
+            elif op == 'del':
+                for id_ in registro['ids']:
+                    if novas.pop(id_, None) is None: excluidos.add(id_)
+            elif op == 'upd':
+                id_ = registro['id']
+                if id_ in novas: novas[id_].update(registro['campos'])
+                else: alteracoes.setdefault(id_, {}).update(registro['campos'])
+        if excluidos: df = df.drop(index=df.index.intersection(list(excluidos)))
+        if alteracoes:
+            mudancas = pd.DataFrame.from_dict(alteracoes, orient='index')
+            mudancas = mudancas.loc[mudancas.index.intersection(df.index)]
+            for col in mudancas.columns:
+                base = df[col].astype(object) if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+                valores = mudancas.loc[[id_ for id_ in mudancas.index if col in alteracoes[id_]], col]  # inclui os None gravados de propósito
+                base.loc[valores.index] = valores
+                df[col] = base
+        if novas:
+            df_novas = pd.DataFrame.from_dict(novas, orient='index')
+            df = pd.concat([df, df_novas]) if not df.empty else df_novas.reindex(columns=list(dict.fromkeys([*df.columns, *df_novas.columns])))
+        return df
+
+    def _estado(self, limite=None, colunas=None):
+        df, crc = self._snapshot.ler(colunas)
+        cabecalho, registros, posicao = self._ler_diario(limite)
+        valido = cabecalho is not None and cabecalho.get('crc') == crc
+        df.index = _expandir_faixas(cabecalho.get('ids') if valido else None, len(df))
+        df = self._reaplicar(df, registros if valido else [])
+        if colunas is not None: df = df[[col for col in colunas if col in df.columns]]
+        return df, crc, cabecalho, registros, posicao, valido
+
+    def _recuperar_compactacao(self):
+        """Conclui (ou descarta) uma compactação interrompida entre as duas trocas de arquivo."""
+        pendente = self.caminho_diario + '.tmp'
+        if os.path.exists(self.caminho + '.tmp'): os.remove(self.caminho + '.tmp')
+        if not os.path.exists(pendente): return
+        try: cabecalho = json.loads(_ler_bytes(pendente).split(b'\n', 1)[0])
+        except json.JSONDecodeError: cabecalho = {}
+        if cabecalho.get('crc') == self._snapshot.assinatura(): os.replace(pendente, self.caminho_diario)
+        else: os.remove(pendente)
+
+    def _reaplicar_inclusoes(self, df, registros, colunas):
+        """O snapshot foi reescrito por fora (edição na planilha, versão antiga do app), então os ids do diário
+        não valem mais. As inclusões não dependem deles: são reaplicadas como linhas novas e gravadas no
+        snapshot. Exclusões e alterações de linhas do snapshot se perdem (o diário antigo fica em .descartado)."""
+        if colunas is not None: df, _ = self._snapshot.ler()
+        incluidos = {id_ for r in registros if r.get('op') == 'ins' for id_ in r['ids']}
+        perdidos = sum(1 for r in registros if r.get('op') in ('del', 'upd') and not set(r.get('ids') or [r.get('id')]) <= incluidos)
+        novas = self._reaplicar(df.iloc[0:0], registros)
+        novas.index = pd.RangeIndex(len(df), len(df) + len(novas))
+        os.replace(self.caminho_diario, self.caminho_diario + '.descartado')
+        if len(novas):
+            df = pd.concat([df, novas]) if not df.empty else novas.reindex(columns=list(dict.fromkeys([*df.columns, *novas.columns])))
+            self._proximo_id = max(self._proximo_id, len(df))
+            self._trocar_snapshot(df, None)
+        self.avisos.append(f"'{self.caminho}' foi alterado fora do app: {len(novas)} lançamento(s) do diário foram reaplicados e "
+                           f"{perdidos} exclusão(ões)/alteração(ões) se perderam (diário antigo em '{self.caminho_diario}.descartado').")
+        return df if colunas is None else df[[col for col in colunas if col in df.columns]]
+
+    def carregar(self, colunas=None):
+        """Snapshot + diário reaplicado. Com `colunas`, lê só essas colunas do snapshot."""
+        if self.formato != 'csv' and not os.path.exists(self.caminho) and os.path.exists(self.caminho_csv):
+            # Ainda não migrado: lê o CSV; o carregador chama reescrever() com os tipos já convertidos.
+            self._legado = Diario(self.caminho_csv, self.colunas)
+            self._legado.compactacao_automatica = False
+            df = self._legado.carregar()
+            self._proximo_id = self._legado._proximo_id
+            return df
+        with self._trava_compactacao, self._trava:
+            self._recuperar_compactacao()
+            df, crc, cabecalho, registros, posicao, valido = self._estado(colunas=colunas)
+            if cabecalho is not None and not valido:
+                df = self._reaplicar_inclusoes(df, registros, colunas)
+                crc, registros = self._snapshot.assinatura(), []
+            elif os.path.exists(self.caminho_diario) and os.path.getsize(self.caminho_diario) > posicao:
+                with open(self.caminho_diario, 'r+b') as f: f.truncate(posicao)
+            ids_vistos = [id_ for r in registros for id_ in r.get('ids', [])]
+            candidatos = [self._proximo_id, (cabecalho or {}).get('proximo', 0) if valido else 0]
+            if len(df): candidatos.append(int(df.index.max()) + 1)
+            if ids_vistos: candidatos.append(max(ids_vistos) + 1)
+            self._crc, self._proximo_id, self._registros = crc, max(candidatos), len(registros)
+        self._talvez_compactar()
+        return df
+
+    # --- Escrita ---
+    def _anexar(self, *registros):
+        with self._trava:
+            if self._crc is None: self._crc = self._snapshot.assinatura()
+            linhas = []
+            if not os.path.exists(self.caminho_diario) or os.path.getsize(self.caminho_diario) == 0:
+                linhas.append(json.dumps({'op': 'base', 'crc': self._crc, 'ids': None, 'proximo': self._proximo_id}))
+            linhas.extend(json.dumps(registro, ensure_ascii=False) for registro in registros)
+            with open(self.caminho_diario, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(linhas) + '\n'); f.flush(); os.fsync(f.fileno())
+            self._registros += len(registros)
+        self._talvez_compactar()
+
+    def inserir(self, df_novas):
+        """Anexa as linhas e devolve os ids atribuídos (use-os como índice no DataFrame em memória)."""
+        with self._trava:
+            ids = list(range(self._proximo_id, self._proximo_id + len(df_novas)))
+            linhas = [{col: _valor_json(v) for col, v in linha.items()} for linha in df_novas.to_dict('records')]
+            self._anexar({'op': 'ins', 'ids': ids, 'linhas': linhas})  # o cabeçalho de um diário novo leva o próximo id de antes desta inclusão
+            self._proximo_id += len(df_novas)
+        return ids
+
+    def excluir(self, ids):
+        ids = [int(i) for i in ids]
+        if ids: self._anexar({'op': 'del', 'ids': ids})
+
+    def atualizar(self, id_, campos): self.atualizar_lote({id_: campos})
+
+    def atualizar_lote(self, alteracoes):
+        """{id: {coluna: valor}}, anexados numa única escrita."""
+        registros = [{'op': 'upd', 'id': int(id_), 'campos': {col: _valor_json(v) for col, v in campos.items()}} for id_, campos in alteracoes.items()]
+        if registros: self._anexar(*registros)
+
+    # --- Compactação ---
+    def _trocar_snapshot(self, df, limite):
+        """Grava `df` como novo snapshot e recomeça o diário com o que foi anexado depois de `limite`."""
+        # As linhas reaplicadas do diário chegam como JSON (datas em texto): tipa tudo antes de gravar.
+        df = _tipar(df.copy(deep=False), datas=COLUNAS_DATAS, numeros=COLUNAS_MONETARIAS)
+        crc = self._snapshot.gravar(df, self.caminho + '.tmp')
+        with self._trava:
+            cauda = _ler_bytes(self.caminho_diario)[limite:] if limite is not None else b''
+            cabecalho = json.dumps({'op': 'base', 'crc': crc, 'ids': _faixas(df.index), 'proximo': self._proximo_id})
+            _gravar_atomico(self.caminho_diario + '.tmp', cabecalho.encode('utf-8') + b'\n' + cauda)
+            os.replace(self.caminho + '.tmp', self.caminho)
+            os.replace(self.caminho_diario + '.tmp', self.caminho_diario)
+            self._crc, self._registros = crc, cauda.count(b'\n')
+
+    def compactar(self):
+        if not self._trava_compactacao.acquire(blocking=False): return
+        try:
+            with self._trava: limite = os.path.getsize(self.caminho_diario) if os.path.exists(self.caminho_diario) else 0
+            df, _, _, _, posicao, _ = self._estado(limite)
+            self._trocar_snapshot(df, posicao)
+            self._adiar_compactacao = 0
+        except Exception:
+            self._adiar_compactacao = self._registros
+            raise
+        finally:
+            self._compactacao_agendada = False
+            self._trava_compactacao.release()
+
+    def _compactar_em_segundo_plano(self):
+        try: self.compactar()
+        except Exception: _log.exception("Falha ao compactar %s; nova tentativa após mais %d registros", self.caminho, LIMITE_COMPACTACAO)
+
+    def _talvez_compactar(self):
+        with self._trava:
+            if not self.compactacao_automatica or self._compactacao_agendada or self._registros < LIMITE_COMPACTACAO + self._adiar_compactacao: return
+            self._compactacao_agendada = True
+        threading.Thread(target=self._compactar_em_segundo_plano, name=f"compactar {self.caminho}", daemon=True).start()
+
+    def reescrever(self, df):
+        """Substitui o snapshot inteiro por `df` (mantendo os ids) e zera o diário; usado nas migrações."""
+        with self._trava_compactacao, self._trava:
+            self._trocar_snapshot(df, None)
+            if self._legado is not None:
+                for caminho in (self._legado.caminho, self._legado.caminho_diario):
+                    if os.path.exists(caminho): os.replace(caminho, caminho + '.migrado')
+                self._legado = None
+
+    @property
+    def migrando(self): return self._legado is not None
+
+
+_diarios = {}
+_trava_diarios = threading.Lock()
+
+def obter_diario(caminho, colunas=None):
+    """Um único Diario por arquivo no processo, compartilhado por todas as sessões."""
+    with _trava_diarios:
+        if caminho not in _diarios: _diarios[caminho] = Diario(caminho, colunas or [], FORMATO)
+        return _diarios[caminho]
+
+
+def avisos_pendentes():
+    """Avisos dos diários ainda não mostrados (cada um é devolvido uma única vez)."""
+    with _trava_diarios: diarios = list(_diarios.values())
+    avisos = []
+    for diario in diarios: avisos, diario.avisos = avisos + diario.avisos, []
+    return avisos
+
+
+# --- Operações usadas pela interface ---
+def _alinhar_categorias(df, novas):
+    """Dá às colunas categóricas de `df` e `novas` as mesmas categorias, para o concat não virar object."""
+    for col in df.columns.intersection(novas.columns):
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            faltando = pd.Index(novas[col].dropna().unique()).difference(df[col].cat.categories)
+            if len(faltando): df[col] = df[col].cat.add_categories(faltando)
+            novas[col] = pd.Categorical(novas[col], categories=df[col].cat.categories)
+
+def inserir_registros(df, novas, caminho):
+    novas = novas.copy()
+    novas.index = obter_diario(caminho).inserir(novas)
+    _alinhar_categorias(df, novas)
+    return pd.concat([df, novas]) if not df.empty else novas.reindex(columns=list(dict.fromkeys([*df.columns, *novas.columns])))
+
+def excluir_registros(df, ids, caminho):
+    obter_diario(caminho).excluir(ids)
+    return df.drop(index=ids)
+
+def atualizar_registros(df, alteracoes, caminho):
+    """Aplica {id: {coluna: valor}} no diário e em `df`, uma coluna por vez."""
+    obter_diario(caminho).atualizar_lote(alteracoes)
+    if not alteracoes: return df
+    mudancas = pd.DataFrame.from_dict(alteracoes, orient='index')
+    for col in mudancas.columns:
+        valores = mudancas.loc[[id_ for id_, campos in alteracoes.items() if col in campos], col]
+        coluna = df[col].copy()  # troca a coluna inteira: `df` pode ser uma vista rasa compartilhada com outras sessões
+        if pd.api.types.is_datetime64_any_dtype(coluna): valores = pd.to_datetime(valores, errors='coerce')  # None vira NaT
+        if isinstance(coluna.dtype, pd.CategoricalDtype):
+            faltando = pd.Index(valores.dropna().unique()).difference(coluna.cat.categories)
+            if len(faltando): coluna = coluna.cat.add_categories(faltando)
+        try: coluna.loc[valores.index] = valores
+        except (TypeError, ValueError):  # dtype incompatível (ex.: microssegundos numa coluna inferida como datetime64[s])
+            coluna = coluna.astype('datetime64[us]' if pd.api.types.is_datetime64_any_dtype(coluna) else object); coluna.loc[valores.index] = valores
+        df[col] = coluna
+    return df
+
+def atualizar_registro(df, id_, campos, caminho): return atualizar_registros(df, {id_: campos}, caminho)
+
+def salvar_dados_json(dados, caminho_arquivo):
+    with open(caminho_arquivo, 'w') as f: json.dump(dados, f)
+
+
+# --- Carga (com lógica de migração robusta) ---
+def _tipar(df, datas=(), numeros=()):
+    """Converte só o que ainda não está no tipo certo (no Parquet as colunas já chegam tipadas)."""
+    for col in df.columns.intersection(list(datas)):
+        if not pd.api.types.is_datetime64_any_dtype(df[col]): df[col] = pd.to_datetime(df[col], errors='coerce', format='ISO8601')
+    for col in df.columns.intersection(list(numeros)):
+        if not pd.api.types.is_float_dtype(df[col]): df[col] = pd.to_numeric(df[col], errors='coerce')
+        if df[col].hasnans: df[col] = df[col].fillna(0)
+    for col in df.columns.intersection(COLUNAS_CATEGORICAS):
+        if not isinstance(df[col].dtype, pd.CategoricalDtype): df[col] = df[col].astype('category')
+    return df
+
+def carregar_transacoes(colunas=None):
+    caminho_arquivo = 'transacoes.csv'
+    diario = obter_diario(caminho_arquivo, COLUNAS_TRANSACOES)
+    df = diario.carregar(colunas)
+    if 'Data' in df.columns and 'Data/Hora' not in df.columns:
+        df.rename(columns={'Data': 'Data/Hora'}, inplace=True)
+    colunas_alteradas = False
+    for col in COLUNAS_TRANSACOES if colunas is None else []:
+        if col not in df.columns:
+            df[col] = np.nan; colunas_alteradas = True
+    df = _tipar(df, datas=['Data/Hora'], numeros=['Valor'])
+    if colunas_alteradas or diario.migrando: diario.reescrever(df)
+    return df
+
+def carregar_freelas():
+    diario = obter_diario('freelancer_jobs.csv', COLUNAS_FREELAS)
+    df = diario.carregar()
+    for col in COLUNAS_FREELAS:
+        if col not in df.columns: df[col] = np.nan
+    df = _tipar(df, datas=['Início', 'Término'], numeros=['Valor da Hora', 'Valor Fixo', 'Valor a Receber'])
+    if diario.migrando: diario.reescrever(df)
+    return df
+
+def carregar_reserva_movimentacoes():
+    diario = obter_diario('reserva_movimentacoes.csv', COLUNAS_RESERVA)
+    df = diario.carregar()
+    for col in COLUNAS_RESERVA:
+        if col not in df.columns: df[col] = np.nan
+    df = _tipar(df, datas=['Data'], numeros=['Valor'])
+    if diario.migrando: diario.reescrever(df)
+    return df
+
+def carregar_freelas_intervalos():
+    diario = obter_diario('freelancer_intervalos.csv', COLUNAS_INTERVALOS)
+    df = diario.carregar()
+    for col in COLUNAS_INTERVALOS:
+        if col not in df.columns: df[col] = np.nan
+    df = _tipar(df, datas=['Início', 'Fim'])
+    df['Trabalho'] = pd.to_numeric(df['Trabalho'], errors='coerce').astype('Int64')
+    if diario.migrando: diario.reescrever(df)
+    return df
+
+def carregar_reserva_meta():
+    try: return json.load(open('reserva_meta.json', 'r')).get('meta', 1000.0)
+    except (FileNotFoundError, json.JSONDecodeError): return 1000.0
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+import armazenamento
+import categorizacao
+import compartilhado
+import faturamento
+import finbot
+import gerar_dados
+import simulador_groq
+from indice import IndicePeriodo
+
+# --- BENCHMARKS: CARGA, FILTRO, AGREGADOS, GRAVAÇÃO E RERUN COMPLETO ---
+# Uso: python benchmarks/executar.py --tamanhos 10000 100000 1000000 [--comparar resultados/anterior.json]
+# Os dados são sintéticos (semente fixa) e a IA aponta para o simulador local, então os números
+# dependem só do código e da máquina. O resultado é gravado em JSON para comparar commits.
+
+PERIODO = datetime(2022, 6, 15)  # mês no meio do intervalo gerado
+
+
+def medir(nome, funcao, repeticoes=3, preparar=None):
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar: preparar()
+        inicio = time.perf_counter(); funcao(); tempos.append(time.perf_counter() - inicio)
+    return {'medida': nome, 'min_s': min(tempos), 'mediana_s': statistics.median(tempos), 'repeticoes': repeticoes}
+
+def _reiniciar_estado():
+    """Esquece os diários e o classificador do processo, como num servidor recém-iniciado."""
+    armazenamento._diarios.clear(); compartilhado._conjuntos.clear()
+    categorizacao._cache, categorizacao._treinado = None, False
+    categorizacao._classificador = categorizacao.ClassificadorLocal()
+
+def _filtro_por_varredura(df, periodo):
+    """O filtro de mês antigo (cópia + to_datetime + máscara sobre tudo), mantido como referência."""
+    df = df.copy()
+    df['Data/Hora'] = pd.to_datetime(df['Data/Hora'], errors='coerce')
+    df = df.dropna(subset=['Data/Hora'])
+    return df[(df['Data/Hora'].dt.year == periodo.year) & (df['Data/Hora'].dt.month == periodo.month)]
+
+def medir_funcoes(linhas, repeticoes):
+    resultados = []
+    _reiniciar_estado(); armazenamento.carregar_transacoes(); armazenamento.carregar_freelas(); armazenamento.carregar_freelas_intervalos(); armazenamento.carregar_reserva_movimentacoes()  # migrações, se houver
+    for carregador in (armazenamento.carregar_transacoes, armazenamento.carregar_freelas, armazenamento.carregar_reserva_movimentacoes):
+        resultados.append(medir(carregador.__name__, carregador, repeticoes, preparar=armazenamento._diarios.clear))
+    df = armazenamento.carregar_transacoes()
+    resultados.append(medir('filtro_mes_varredura', lambda: _filtro_por_varredura(df, PERIODO), repeticoes))
+    resultados.append(medir('indice_construcao', lambda: IndicePeriodo(df), repeticoes))
+    indice = IndicePeriodo(df)
+    resultados.append(medir('filtro_mes_indice', lambda: indice.linhas_mes(df, PERIODO.year, PERIODO.month), repeticoes))
+    resultados.append(medir('agregados_historico', lambda: (indice.totais_mes(PERIODO.year, PERIODO.month), indice.tendencia(PERIODO.year, PERIODO.month)), repeticoes))
+    resultados.append(medir('agregados_analise', lambda: indice.por_categoria(PERIODO.year, PERIODO.month), repeticoes))
+    freelas, intervalos, agora = armazenamento.carregar_freelas(), armazenamento.carregar_freelas_intervalos(), gerar_dados.AGORA
+    resultados.append(medir('faturamento_trabalhos', lambda: faturamento.calcular(freelas, intervalos, agora), repeticoes))
+    resultados.append(medir('faturamento_mensal', lambda: faturamento.receita_mensal(freelas, intervalos, agora), repeticoes))
+    resultados.append(medir('resumo_finbot', lambda: finbot.resumo_financeiro(indice, PERIODO.year, PERIODO.month, 'junho'), repeticoes))
+    nova = pd.DataFrame([[datetime.now(), 'Uber 1', 10.0, 'Despesa', 'Transporte', 'Geral', '']], columns=armazenamento.COLUNAS_TRANSACOES)
+    estado = {'df': df}
+    def inserir(): estado['df'] = armazenamento.inserir_registros(estado['df'], nova, 'transacoes.csv')
+    resultados.append(medir('salvar_inserir_transacao', inserir, max(repeticoes, 20)))
+    resultados.append(medir('salvar_reescrita_csv_completa', lambda: estado['df'].to_csv('reescrita.csv', index=False), repeticoes))
+    resultados.append(medir('salvar_compactacao', armazenamento.obter_diario('transacoes.csv').compactar, repeticoes))
+    for resultado in resultados: resultado['linhas'] = linhas
+    return resultados
+
+def medir_apptest(linhas, repeticoes):
+    from streamlit.testing.v1 import AppTest
+    resultados = []
+    def nova_sessao():
+        _reiniciar_estado()
+        at = AppTest.from_file(os.path.join(RAIZ, 'app.py'), default_timeout=600)
+        at.secrets['GROQ_API_KEY'] = 'simulador'
+        at.session_state['periodo_selecionado'] = PERIODO
+        return at
+    sessao = {}
+    def primeira_execucao(): sessao['at'] = nova_sessao().run()
+    resultados.append(medir('apptest_primeira_execucao', primeira_execucao, repeticoes))
+    at = sessao['at']
+    resultados.append(medir('apptest_rerun', at.run, repeticoes))
+    resultados.append(medir('apptest_navegar_mes', lambda: [b for b in at.button if b.key == 'prev_historico'][0].click().run(), repeticoes))
+    def sugerir():
+        at.text_input[0].input('Mercado da esquina'); [b for b in at.button if 'Sugerir' in b.label][0].click().run()
+    resultados.append(medir('apptest_sugerir_categoria', sugerir, repeticoes))
+    resultados.append(medir('apptest_chat_finbot', lambda: at.chat_input[0].set_value('Como montar uma reserva?').run(), repeticoes))
+    if at.exception: raise RuntimeError(f"O app falhou durante o benchmark: {at.exception}")
+    for resultado in resultados: resultado['linhas'] = linhas
+    return resultados
+
+def comparar(atuais, caminho_anterior):
+    with open(caminho_anterior, encoding='utf-8') as f: anteriores = {(r['linhas'], r['medida']): r for r in json.load(f)['resultados']}
+    print(f"\n{'linhas':>9}  {'medida':<32} {'antes (s)':>10} {'agora (s)':>10} {'variação':>9}")
+    for r in atuais:
+        anterior = anteriores.get((r['linhas'], r['medida']))
+        if anterior is None: continue
+        variacao = r['min_s'] / anterior['min_s'] - 1 if anterior['min_s'] else 0.0
+        print(f"{r['linhas']:>9}  {r['medida']:<32} {anterior['min_s']:>10.4f} {r['min_s']:>10.4f} {variacao:>+8.0%}")
+
+def _commit():
+    try: return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError): return 'desconhecido'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks de carga, filtro, agregados, gravação e rerun do app")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help="linhas de transações (freelas e reserva: 1/10)")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--sem-apptest', action='store_true', help="não mede o rerun completo via AppTest")
+    parser.add_argument('--saida', default=None, help="padrão: benchmarks/resultados/<commit>.json")
+    parser.add_argument('--comparar', default=None, help="JSON de uma execução anterior")
+    argumentos = parser.parse_args()
+
+    servidor = simulador_groq.iniciar()
+    os.environ['GROQ_BASE_URL'] = f"http://127.0.0.1:{servidor.server_port}"
+    commit = _commit()
+    saida = os.path.abspath(argumentos.saida or os.path.join(RAIZ, 'benchmarks', 'resultados', f'{commit}.json'))
+    resultados = []
+    for linhas in argumentos.tamanhos:
+        with tempfile.TemporaryDirectory() as diretorio:
+            gerar_dados.gerar(diretorio, linhas, linhas // 10, linhas // 10)
+            anterior = os.getcwd(); os.chdir(diretorio)
+            try:
+                resultados += medir_funcoes(linhas, argumentos.repeticoes)
+                if not argumentos.sem_apptest: resultados += medir_apptest(linhas, argumentos.repeticoes)
+            finally: os.chdir(anterior)
+        for r in resultados:
+            if r['linhas'] == linhas: print(f"{linhas:>9}  {r['medida']:<32} {r['min_s']:.4f}s (mediana {r['mediana_s']:.4f}s)")
+
+    os.makedirs(os.path.dirname(saida), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump({'commit': commit, 'data': datetime.now().isoformat(timespec='seconds'), 'formato': armazenamento.FORMATO,
+                   'python': platform.python_version(), 'pandas': pd.__version__, 'maquina': platform.machine(), 'resultados': resultados}, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {saida}")
+    if argumentos.comparar: comparar(resultados, argumentos.comparar)
+    servidor.shutdown()
@@ -0,0 +1,85 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# --- GERADOR DE DADOS SINTÉTICOS ---
+# Cria transacoes.csv, freelancer_jobs.csv, freelancer_intervalos.csv e reserva_movimentacoes.csv no esquema do app,
+# com semente fixa para que os tempos sejam comparáveis entre commits.
+
+DESCRICOES = {'Alimentação': ['Mercado', 'Padaria', 'Restaurante', 'iFood'], 'Transporte': ['Uber', 'Gasolina', 'Metrô'],
+              'Moradia': ['Aluguel', 'Conta de luz', 'Internet'], 'Lazer': ['Cinema', 'Netflix', 'Bar'], 'Saúde': ['Farmácia', 'Consulta médica'],
+              'Compras': ['Loja de roupas', 'Amazon'], 'Salário': ['Salário'], 'Outros': ['Cigarro', 'Presente']}
+PESOS = {'Alimentação': 0.3, 'Transporte': 0.2, 'Moradia': 0.1, 'Lazer': 0.1, 'Saúde': 0.08, 'Compras': 0.1, 'Salário': 0.04, 'Outros': 0.08}
+INICIO = pd.Timestamp('2020-01-01')
+ANOS = 5
+AGORA = INICIO + pd.DateOffset(years=ANOS)  # "agora" fixo: trabalhos em andamento e faturamento iguais em toda execução
+
+
+def gerar_transacoes(n, rng):
+    pares = [(categoria, descricao) for categoria, descricoes in DESCRICOES.items() for descricao in descricoes]
+    pesos = np.array([PESOS[categoria] / len(DESCRICOES[categoria]) for categoria, _ in pares])
+    escolhidos = rng.choice(len(pares), n, p=pesos / pesos.sum())
+    categorias = np.array([c for c, _ in pares])[escolhidos]
+    descricao = np.array([d for _, d in pares])[escolhidos]
+    numero = rng.integers(0, 500, n).astype(str)
+    receita = categorias == 'Salário'
+    return pd.DataFrame({'Data/Hora': INICIO + pd.to_timedelta(rng.integers(0, ANOS * 365 * 86400, n), unit='s'),
+                         'Descrição': np.char.add(np.char.add(descricao, ' '), numero),  # sufixo para variar o texto
+                         'Valor': np.where(receita, rng.integers(200000, 800000, n), rng.integers(100, 50000, n)) / 100,
+                         'Tipo': np.where(receita, 'Receita', 'Despesa'), 'Categoria': categorias,
+                         'Subcategoria': rng.choice(['Geral', 'Mensal', 'Eventual'], n), 'Descrição da IA': 'Outros -> N/A'}).sort_values('Data/Hora')
+
+def gerar_freelas(n, rng):
+    inicio = pd.Series(INICIO + pd.to_timedelta(rng.integers(0, ANOS * 365 * 86400, n), unit='s'))
+    por_hora = rng.random(n) < 0.6
+    concluido = rng.random(n) < 0.95
+    # os trabalhos ainda abertos começaram na última semana (senão acumulariam anos de horas até hoje)
+    inicio = inicio.where(concluido, AGORA - pd.to_timedelta(rng.integers(3600, 7 * 86400, n), unit='s'))
+    pausado = ~concluido & (rng.random(n) < 0.5)
+    termino = (inicio + pd.to_timedelta(rng.integers(3600, 40 * 3600, n), unit='s')).where(concluido)
+    valor_hora = np.where(por_hora, rng.integers(50, 200, n), 0).astype(float)
+    valor_fixo = np.where(por_hora, 0, rng.integers(500, 5000, n)).astype(float)
+    horas = (termino - inicio).dt.total_seconds().fillna(0).to_numpy() / 3600
+    return pd.DataFrame({'Descrição': np.char.add('Projeto ', np.arange(n).astype(str)), 'Status': np.where(concluido, 'Concluído', np.where(pausado, 'Pausado', 'Em Andamento')),
+                         'Modo de Cobrança': np.where(por_hora, 'Valor por Hora', 'Valor Fixo'), 'Valor da Hora': valor_hora, 'Valor Fixo': valor_fixo,
+                         'Início': inicio, 'Término': termino, 'Valor a Receber': np.where(concluido, np.where(por_hora, horas * valor_hora, valor_fixo), 0)})
+
+def gerar_intervalos(freelas, rng, maximo=5):
+    """De 1 a `maximo` intervalos por trabalho, com pausas entre eles; o último dos trabalhos em andamento fica aberto."""
+    pedacos = rng.integers(1, maximo + 1, len(freelas))
+    linha = np.repeat(np.arange(len(freelas)), pedacos)
+    ordem = np.arange(len(linha)) - np.repeat(np.cumsum(pedacos) - pedacos, pedacos)
+    inicio = freelas['Início'].to_numpy()[linha]
+    fim = freelas['Término'].fillna(AGORA).to_numpy()[linha]
+    fatia = (fim - inicio) / pedacos[linha]
+    comeco = inicio + fatia * ordem
+    termino = comeco + fatia * rng.uniform(0.5, 1.0, len(linha))
+    aberto = (freelas['Status'] == 'Em Andamento').to_numpy()[linha] & (ordem == pedacos[linha] - 1)
+    return pd.DataFrame({'Trabalho': linha, 'Início': comeco, 'Fim': pd.Series(termino).where(~aberto).dt.floor('s')}).assign(Início=lambda df: df['Início'].dt.floor('s'))
+
+def gerar_reserva(n, rng):
+    return pd.DataFrame({'Data': INICIO + pd.to_timedelta(np.sort(rng.integers(0, ANOS * 365 * 86400, n)), unit='s'),
+                         'Tipo': np.where(rng.random(n) < 0.85, 'Aporte', 'Retirada'), 'Valor': rng.integers(1000, 100000, n) / 100})
+
+def gerar(diretorio, transacoes, freelas, reserva, semente=42):
+    rng = np.random.default_rng(semente)
+    os.makedirs(diretorio, exist_ok=True)
+    gerar_transacoes(transacoes, rng).to_csv(os.path.join(diretorio, 'transacoes.csv'), index=False)
+    trabalhos = gerar_freelas(freelas, rng)
+    trabalhos.to_csv(os.path.join(diretorio, 'freelancer_jobs.csv'), index=False)
+    gerar_intervalos(trabalhos, rng).to_csv(os.path.join(diretorio, 'freelancer_intervalos.csv'), index=False)
+    gerar_reserva(reserva, rng).to_csv(os.path.join(diretorio, 'reserva_movimentacoes.csv'), index=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera os CSVs do app com dados sintéticos")
+    parser.add_argument('diretorio')
+    parser.add_argument('--transacoes', type=int, default=100_000)
+    parser.add_argument('--freelas', type=int, default=None, help="padrão: transações / 10")
+    parser.add_argument('--reserva', type=int, default=None, help="padrão: transações / 10")
+    parser.add_argument('--semente', type=int, default=42)
+    argumentos = parser.parse_args()
+    gerar(argumentos.diretorio, argumentos.transacoes, argumentos.freelas or argumentos.transacoes // 10,
+          argumentos.reserva or argumentos.transacoes // 10, argumentos.semente)
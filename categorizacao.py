@@ -0,0 +1,227 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import groq
+import pandas as pd
+
+# --- CATEGORIZAÇÃO: CACHE PERSISTENTE + CLASSIFICADOR LOCAL + CLIENTE ÚNICO ---
+# Ordem de consulta: cache (descrições já vistas) -> classificador local treinado com as transações
+# já categorizadas -> modelo na Groq. Só descrições realmente novas geram chamada de rede.
+
+MODELO = "llama3-70b-8192"
+CATEGORIAS = ["Alimentação", "Moradia", "Transporte", "Lazer", "Saúde", "Educação", "Compras", "Salário", "Investimentos", "Outros"]
+PROMPT_CATEGORIZACAO = ('Você é um assistente financeiro especialista. Responda APENAS com um objeto JSON no formato: {"categoria": "...", "subcategoria": "..."}. '
+                        f'Categorias permitidas: {", ".join(CATEGORIAS)}. Exemplos: "Óculos de sol" -> {{"categoria": "Compras", "subcategoria": "Acessórios"}}; '
+                        '"Consulta médica" -> {"categoria": "Saúde", "subcategoria": "Médico"}.')
+PROMPT_CATEGORIZACAO_LOTE = ('Você é um assistente financeiro especialista. Você receberá uma lista JSON de transações com "id" e "descricao". '
+                             'Responda APENAS com um objeto JSON no formato: {"itens": [{"id": 0, "categoria": "...", "subcategoria": "..."}]}, com um item para cada id recebido. '
+                             f'Categorias permitidas: {", ".join(CATEGORIAS)}.')
+CAMINHO_CACHE = 'categorias_cache.json'
+TAMANHO_CACHE = 5000
+CONFIANCA_MINIMA = 0.6  # fração dos votos que o classificador local precisa para dispensar a IA
+TAMANHO_LOTE_IA = 40    # descrições por requisição na categorização em lote
+TRABALHADORES_IA = 4    # requisições simultâneas no máximo
+TENTATIVAS_IA = 4
+
+
+def normalizar(descricao):
+    texto = unicodedata.normalize('NFKD', str(descricao)).encode('ascii', 'ignore').decode('ascii').lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', texto))
+
+
+class CacheCategorias:
+    """Memo LRU persistido em JSON: descrição normalizada -> [categoria, subcategoria]."""
+    def __init__(self, caminho=CAMINHO_CACHE, tamanho=TAMANHO_CACHE):
+        self.caminho, self.tamanho = caminho, tamanho
+        self._trava = threading.Lock()
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f: self._itens = OrderedDict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError): self._itens = OrderedDict()
+
+    def obter(self, chave):
+        with self._trava:
+            if chave not in self._itens: return None
+            self._itens.move_to_end(chave)
+            return tuple(self._itens[chave])
+
+    def guardar(self, chave, categoria, subcategoria, persistir=True):
+        with self._trava:
+            self._itens[chave] = [categoria, subcategoria]; self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho: self._itens.popitem(last=False)
+        if persistir: self.salvar()
+
+    def salvar(self):
+        with self._trava:
+            temporario = self.caminho + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f: json.dump(self._itens, f, ensure_ascii=False)
+            os.replace(temporario, self.caminho)
+
+    def __len__(self): return len(self._itens)
+
+
+class ClassificadorLocal:
+    """Votação por descrição exata e, na falta dela, por palavras, usando as transações já rotuladas."""
+    def __init__(self):
+        self._exatos = defaultdict(Counter)
+        self._palavras = defaultdict(Counter)
+        self._trava = threading.Lock()
+
+    def treinar(self, df):
+        if df.empty or 'Categoria' not in df.columns: return
+        rotuladas = df[df['Categoria'].notna() & (df['Categoria'].astype(str) != '')]
+        subcategorias = rotuladas['Subcategoria'].astype(object).where(rotuladas['Subcategoria'].notna() & (rotuladas['Subcategoria'].astype(str) != ''), 'N/A') if 'Subcategoria' in rotuladas.columns else 'N/A'
+        # Agrupa antes: normalizar() custa ~10 µs e o histórico repete muito as mesmas descrições.
+        triplas = pd.DataFrame({'descricao': rotuladas['Descrição'].astype(str), 'categoria': rotuladas['Categoria'].astype(str), 'subcategoria': subcategorias})
+        for (descricao, categoria, subcategoria), peso in triplas.value_counts(sort=False).items():
+            self.aprender(descricao, categoria, subcategoria, int(peso))
+
+    def aprender(self, descricao, categoria, subcategoria, peso=1):
+        chave = normalizar(descricao)
+        if not chave: return
+        with self._trava:
+            self._exatos[chave][(categoria, subcategoria)] += peso
+            for palavra in set(chave.split()):
+                if len(palavra) > 2: self._palavras[palavra][(categoria, subcategoria)] += peso
+
+    def prever(self, descricao):
+        chave = normalizar(descricao)
+        with self._trava:
+            votos = self._exatos.get(chave)
+            if not votos:
+                votos = Counter()
+                for palavra in set(chave.split()): votos.update(self._palavras.get(palavra, {}))
+        if not votos: return None
+        (rotulo, contagem), total = votos.most_common(1)[0], sum(votos.values())
+        return rotulo if contagem / total >= CONFIANCA_MINIMA else None
+
+
+class Estatisticas:
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.contadores = Counter()
+        self.latencia_ms = defaultdict(float)
+
+    def registrar(self, origem, inicio):
+        with self._trava:
+            self.contadores[origem] += 1
+            self.latencia_ms[origem] += (time.perf_counter() - inicio) * 1000
+
+    def resumo(self):
+        with self._trava:
+            acertos = self.contadores['cache'] + self.contadores['local']
+            return {'acertos': acertos, 'falhas': self.contadores['ia'], 'erros': self.contadores['erro'],
+                    **{f'latencia_media_ms_{origem}': self.latencia_ms[origem] / n for origem, n in self.contadores.items() if n}}
+
+
+_cache = None
+_classificador = ClassificadorLocal()
+_estatisticas = Estatisticas()
+_clientes = {}
+_treinado = False
+_trava_global = threading.Lock()
+
+def obter_cache():
+    global _cache
+    with _trava_global:
+        if _cache is None: _cache = CacheCategorias()
+        return _cache
+
+def obter_cliente(api_key):
+    """Um groq.Client por chave, reaproveitado (com seu pool de conexões) entre chamadas e sessões.
+    O endpoint pode ser trocado por um servidor local via GROQ_BASE_URL."""
+    with _trava_global:
+        if api_key not in _clientes: _clientes[api_key] = groq.Client(api_key=api_key, base_url=os.environ.get('GROQ_BASE_URL'))
+        return _clientes[api_key]
+
+def treinar(df):
+    """Treina o classificador local uma vez por processo; depois ele aprende incrementalmente."""
+    global _treinado
+    with _trava_global:
+        if _treinado: return
+        _treinado = True
+    _classificador.treinar(df)
+
+def estatisticas(): return _estatisticas.resumo()
+
+def aprender(descricao, categoria, subcategoria):
+    """Registra a classificação confirmada pelo usuário; ela passa a valer para a mesma descrição."""
+    chave = normalizar(descricao)
+    if not chave: return
+    obter_cache().guardar(chave, categoria, subcategoria)
+    _classificador.aprender(descricao, categoria, subcategoria)
+
+def consultar_local(descricao):
+    """Cache e classificador local, sem rede. Retorna (categoria, subcategoria) ou None."""
+    inicio, chave = time.perf_counter(), normalizar(descricao)
+    resultado = obter_cache().obter(chave)
+    if resultado is not None: _estatisticas.registrar('cache', inicio); return resultado
+    resultado = _classificador.prever(descricao)
+    if resultado is not None:
+        obter_cache().guardar(chave, *resultado, persistir=False); _estatisticas.registrar('local', inicio)
+    return resultado
+
+def categorizar(descricao, api_key):
+    resultado = consultar_local(descricao)
+    if resultado is not None: return resultado
+    inicio = time.perf_counter()
+    try:
+        chat_completion = obter_cliente(api_key).chat.completions.create(messages=[{"role": "system", "content": PROMPT_CATEGORIZACAO}, {"role": "user", "content": f"Classifique a despesa: '{descricao}'"}], model=MODELO, temperature=0.0, response_format={"type": "json_object"})
+        response_json = json.loads(chat_completion.choices[0].message.content)
+    except Exception: _estatisticas.registrar('erro', inicio); raise
+    _estatisticas.registrar('ia', inicio)
+    categoria, subcategoria = response_json.get("categoria", "Outros"), response_json.get("subcategoria", "N/A")
+    obter_cache().guardar(normalizar(descricao), categoria, subcategoria)
+    return categoria, subcategoria
+
+
+def _categorizar_lote(descricoes, api_key):
+    """Uma requisição para várias descrições, com novas tentativas e recuo exponencial."""
+    conteudo = "Classifique as transações:\n" + json.dumps([{"id": i, "descricao": d} for i, d in enumerate(descricoes)], ensure_ascii=False)
+    for tentativa in range(TENTATIVAS_IA):
+        inicio = time.perf_counter()
+        try:
+            chat_completion = obter_cliente(api_key).chat.completions.create(messages=[{"role": "system", "content": PROMPT_CATEGORIZACAO_LOTE}, {"role": "user", "content": conteudo}], model=MODELO, temperature=0.0, response_format={"type": "json_object"})
+            itens = json.loads(chat_completion.choices[0].message.content).get("itens", [])
+            _estatisticas.registrar('ia', inicio)
+            resultado = {}
+            for item in itens:
+                try: resultado[int(item["id"])] = (item.get("categoria", "Outros"), item.get("subcategoria", "N/A"))
+                except (KeyError, TypeError, ValueError): continue
+            return [resultado.get(i, ("Outros", "N/A")) for i in range(len(descricoes))]
+        except Exception:
+            _estatisticas.registrar('erro', inicio)
+            if tentativa == TENTATIVAS_IA - 1: raise
+            time.sleep((2 ** tentativa) * 0.5 + random.uniform(0, 0.25))
+
+def categorizar_em_lotes(descricoes, api_key, ao_progredir=None):
+    """Categoriza muitas descrições: as conhecidas saem do cache/classificador local, as novas vão à IA
+    em lotes de TAMANHO_LOTE_IA, com até TRABALHADORES_IA requisições simultâneas.
+    Retorna {descrição: (categoria, subcategoria)} e o número de lotes que falharam (ficam como "Outros")."""
+    resultados, pendentes = {}, {}
+    for descricao in dict.fromkeys(descricoes):
+        local = consultar_local(descricao)
+        if local is not None: resultados[descricao] = local
+        else: pendentes.setdefault(normalizar(descricao), []).append(descricao)
+    chaves = list(pendentes)
+    lotes = [chaves[i:i + TAMANHO_LOTE_IA] for i in range(0, len(chaves), TAMANHO_LOTE_IA)]
+    falhas = 0
+    with ThreadPoolExecutor(max_workers=TRABALHADORES_IA) as executor:
+        futuros = {executor.submit(_categorizar_lote, [pendentes[c][0] for c in lote], api_key): lote for lote in lotes}
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            lote = futuros[futuro]
+            try: rotulos = futuro.result()
+            except Exception: rotulos = [("Outros", "N/A")] * len(lote); falhas += 1
+            else:
+                for chave, rotulo in zip(lote, rotulos): obter_cache().guardar(chave, *rotulo, persistir=False)
+            for chave, rotulo in zip(lote, rotulos):
+                for descricao in pendentes[chave]: resultados[descricao] = rotulo
+            if ao_progredir: ao_progredir(concluidos, len(lotes))
+    if lotes: obter_cache().salvar()
+    return resultados, falhas
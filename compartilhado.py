@@ -0,0 +1,129 @@
+import threading
+from collections import deque
+
+import pandas as pd
+
+import armazenamento
+from indice import IndicePeriodo
+
+# --- DADOS COMPARTILHADOS ENTRE AS SESSÕES ---
+# Cada conjunto é carregado uma única vez por processo. As sessões recebem vistas (copy(deep=False),
+# que no pandas 3 é copy-on-write: nada é copiado enquanto ninguém alterar a vista), então a memória
+# não cresce com o número de abas abertas. As gravações nunca alteram arrays no lugar: inserir e
+# excluir geram DataFrames novos e atualizar troca as colunas alteradas inteiras. Toda gravação passa pela trava do conjunto: grava no
+# diário, publica um novo DataFrame e incrementa a versão, anotando as partições (ano, mês) afetadas.
+# Uma sessão que chega com uma versão antiga consulta mudancas_desde() e só olha esses meses.
+# O IndicePeriodo das transações também é único e atualizado só nos meses afetados.
+
+HISTORICO_MUDANCAS = 1000  # versões lembradas para mudancas_desde()
+
+
+class Conjunto:
+    def __init__(self, caminho, carregador, coluna_data, indexar=False):
+        self.caminho = caminho
+        self._carregador, self._coluna_data, self._indexar = carregador, coluna_data, indexar
+        self._trava = threading.RLock()
+        self._df = None
+        self.indice = None
+        self.versao = 0
+        self.versoes_particoes = {}  # (ano, mes) -> última versão que alterou o mês
+        self._mudancas = deque(maxlen=HISTORICO_MUDANCAS)  # (versão, partições)
+
+    def _garantir_carga(self):
+        if self._df is not None: return
+        with self._trava:
+            if self._df is None:
+                df = self._carregador()
+                self.indice = IndicePeriodo(df) if self._indexar else None
+                self._df = df
+
+    def vista(self):
+        """(DataFrame, versão). Alterar o DataFrame devolvido não afeta as outras sessões."""
+        self._garantir_carga()
+        with self._trava: return self._df.copy(deep=False), self.versao
+
+    @property
+    def carregado(self): return self._df is not None
+
+    def _particoes(self, df):
+        datas = pd.to_datetime(df[self._coluna_data], errors='coerce', format='ISO8601').dropna()
+        return set(zip(datas.dt.year.tolist(), datas.dt.month.tolist()))
+
+    def _publicar(self, df, particoes):
+        self.versao += 1
+        self._df = df
+        for particao in particoes: self.versoes_particoes[particao] = self.versao
+        self._mudancas.append((self.versao, frozenset(particoes)))
+
+    def mudancas_desde(self, versao):
+        """Partições alteradas depois de `versao`; None se o histórico não alcança (a sessão deve reler tudo)."""
+        with self._trava:
+            if versao == self.versao: return set()
+            if not self._mudancas or self._mudancas[0][0] > versao + 1: return None
+            return set().union(*(particoes for v, particoes in self._mudancas if v > versao))
+
+    # --- Gravações (serializadas pela trava do conjunto) ---
+    def inserir(self, novas):
+        """Grava as linhas e devolve-as com os ids atribuídos."""
+        self._garantir_carga()
+        with self._trava:
+            df = armazenamento.inserir_registros(self._df.copy(deep=False), novas, self.caminho)
+            gravadas = df.tail(len(novas))
+            if self.indice is not None: self.indice.adicionar(gravadas)
+            self._publicar(df, self._particoes(gravadas))
+            return gravadas
+
+    def excluir(self, ids):
+        """Exclui as linhas que ainda existem (outra sessão pode já tê-las excluído); devolve quantas."""
+        self._garantir_carga()
+        with self._trava:
+            ids = self._df.index.intersection(ids)
+            if ids.empty: return 0
+            removidas = self._df.loc[ids]
+            df = armazenamento.excluir_registros(self._df.copy(deep=False), ids.tolist(), self.caminho)
+            if self.indice is not None: self.indice.remover(removidas)
+            self._publicar(df, self._particoes(removidas))
+            return len(ids)
+
+    def atualizar(self, id_, campos, esperado=None):
+        """Altera uma linha. Com `esperado`, só grava se a linha ainda tiver esses valores (evita
+        sobrescrever uma alteração feita por outra sessão). Devolve se gravou."""
+        return bool(self.atualizar_lote({id_: campos}, esperado))
+
+    def atualizar_lote(self, alteracoes, esperado=None):
+        """{id: {coluna: valor}} numa única gravação. `esperado` ({coluna: valor ou lista de valores aceitos})
+        vale para todas as linhas; as que não batem (ou já não existem) ficam de fora. Devolve os ids gravados."""
+        self._garantir_carga()
+        with self._trava:
+            ids = self._df.index.intersection(list(alteracoes))
+            antes = self._df.loc[ids]
+            for col, valor in (esperado or {}).items():
+                antes = antes[antes[col].isin(valor) if isinstance(valor, (list, tuple, set)) else antes[col] == valor]
+            if antes.empty: return []
+            ids = antes.index.tolist()
+            df = armazenamento.atualizar_registros(self._df.copy(deep=False), {id_: alteracoes[id_] for id_ in ids}, self.caminho)
+            depois = df.loc[ids]
+            if self.indice is not None: self.indice.remover(antes); self.indice.adicionar(depois)
+            self._publicar(df, self._particoes(antes) | self._particoes(depois))
+            return ids
+
+
+_CONJUNTOS = {
+    'transacoes': ('transacoes.csv', armazenamento.carregar_transacoes, 'Data/Hora', True),
+    'freelas': ('freelancer_jobs.csv', armazenamento.carregar_freelas, 'Início', False),
+    'reserva_movimentacoes': ('reserva_movimentacoes.csv', armazenamento.carregar_reserva_movimentacoes, 'Data', False),
+    'freelas_intervalos': ('freelancer_intervalos.csv', armazenamento.carregar_freelas_intervalos, 'Início', False),
+}
+_conjuntos = {}
+_trava_conjuntos = threading.Lock()
+
+def obter(nome):
+    """O Conjunto `nome` do processo, compartilhado por todas as sessões."""
+    with _trava_conjuntos:
+        if nome not in _conjuntos: _conjuntos[nome] = Conjunto(*_CONJUNTOS[nome])
+        return _conjuntos[nome]
+
+def dataframes():
+    """Os DataFrames publicados (para medir memória)."""
+    with _trava_conjuntos: conjuntos = dict(_conjuntos)
+    return {nome: conjunto._df for nome, conjunto in conjuntos.items() if conjunto.carregado}
@@ -0,0 +1,117 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# --- FATURAMENTO DOS FREELAS ---
+# Cada trabalho tem seus intervalos de trabalho (Trabalho, Início, Fim) em freelancer_intervalos.csv:
+# iniciar e retomar abrem um intervalo, pausar e finalizar fecham. Horas e valores de todos os
+# trabalhos saem de uma única passada vetorizada sobre os intervalos (intervalos abertos contam até
+# `agora`). Trabalhos anteriores aos intervalos contam como um intervalo único de Início a Término.
+#
+# Ganho mensal: nos trabalhos por hora, as horas de cada mês × valor da hora (um intervalo que
+# atravessa a virada do mês é dividido entre os meses); nos de valor fixo, o valor no mês do término.
+
+EM_ANDAMENTO, PAUSADO, CONCLUIDO = 'Em Andamento', 'Pausado', 'Concluído'
+ATIVOS = [EM_ANDAMENTO, PAUSADO]
+POR_HORA = 'Valor por Hora'
+
+_trava = threading.Lock()  # as ações gravam em dois conjuntos (trabalhos e intervalos)
+
+
+def intervalos_efetivos(freelas, intervalos, agora):
+    """Intervalos de todos os trabalhos de `freelas`, com Fim preenchido, incluindo os implícitos dos trabalhos antigos."""
+    registrados = intervalos.loc[intervalos['Trabalho'].isin(freelas.index), ['Trabalho', 'Início', 'Fim']]
+    antigos = freelas.loc[freelas.index.difference(registrados['Trabalho'].dropna()), ['Status', 'Início', 'Término']]
+    fim_antigos = antigos['Término'].where(antigos['Término'].notna() | (antigos['Status'] != CONCLUIDO), antigos['Início'])
+    partes = [parte for parte in (registrados.astype({'Trabalho': 'int64'}),
+                                  pd.DataFrame({'Trabalho': antigos.index, 'Início': antigos['Início'].to_numpy(), 'Fim': fim_antigos.to_numpy()}))
+              if not parte.empty]
+    if not partes: return pd.DataFrame({'Trabalho': pd.Series(dtype='int64'), 'Início': pd.Series(dtype='datetime64[us]'), 'Fim': pd.Series(dtype='datetime64[us]')})
+    todos = pd.concat(partes, ignore_index=True).astype({'Início': 'datetime64[us]', 'Fim': 'datetime64[us]'})
+    todos['Fim'] = todos['Fim'].fillna(pd.Timestamp(agora))
+    return todos.dropna(subset=['Início'])
+
+def calcular(freelas, intervalos, agora):
+    """Horas trabalhadas e valor acumulado de cada trabalho (índice = id do trabalho)."""
+    todos = intervalos_efetivos(freelas, intervalos, agora)
+    duracao = (todos['Fim'] - todos['Início']).dt.total_seconds().clip(lower=0) / 3600
+    horas = duracao.groupby(todos['Trabalho']).sum().reindex(freelas.index, fill_value=0.0).to_numpy(dtype=float)
+    por_hora = (freelas['Modo de Cobrança'] == POR_HORA).to_numpy()
+    valor = np.where(por_hora, horas * freelas['Valor da Hora'].to_numpy(dtype=float), freelas['Valor Fixo'].to_numpy(dtype=float))
+    return pd.DataFrame({'Horas': horas, 'Valor Acumulado': valor}, index=freelas.index)
+
+def _mes(datas):
+    """Meses desde 1970-01 (o ordinal de um Period mensal)."""
+    datas = pd.to_datetime(datas, errors='coerce')
+    return (datas.dt.year * 12 + datas.dt.month - 1970 * 12 - 1).to_numpy(dtype='int64')
+
+def receita_mensal(freelas, intervalos, agora):
+    """Horas e ganho por mês (índice: Period mensal)."""
+    todos = intervalos_efetivos(freelas, intervalos, agora)
+    inicio, fim = todos['Início'].to_numpy(), todos['Fim'].to_numpy()
+    mes_inicio = _mes(todos['Início'])
+    meses = np.maximum(_mes(todos['Fim']) - mes_inicio + 1, 1)
+    # Um pedaço por (intervalo, mês tocado): repete cada intervalo e recorta nas bordas do mês.
+    linha = np.repeat(np.arange(len(todos)), meses)
+    mes = mes_inicio[linha] + (np.arange(meses.sum()) - np.repeat(np.cumsum(meses) - meses, meses))
+    primeiro = mes.min() if len(mes) else 0
+    bordas = np.arange(primeiro, primeiro + (mes.max() - primeiro + 2 if len(mes) else 1)).astype('datetime64[M]').astype(inicio.dtype)
+    trecho_inicio = np.maximum(inicio[linha], bordas[mes - primeiro])
+    trecho_fim = np.minimum(fim[linha], bordas[mes - primeiro + 1]) if len(mes) else fim[linha]
+    horas = np.clip((trecho_fim - trecho_inicio) / np.timedelta64(1, 'h'), 0, None)
+    valor_hora = freelas['Valor da Hora'].where(freelas['Modo de Cobrança'] == POR_HORA, 0.0).astype(float)
+    por_hora = pd.DataFrame({'Mês': mes, 'Horas': horas, 'Valor': horas * valor_hora.reindex(todos['Trabalho'].to_numpy()[linha]).to_numpy()})
+    fixos = freelas[(freelas['Modo de Cobrança'] != POR_HORA) & (freelas['Status'] == CONCLUIDO) & freelas['Término'].notna()]
+    fixos = pd.DataFrame({'Mês': _mes(fixos['Término']), 'Horas': 0.0, 'Valor': fixos['Valor Fixo'].to_numpy(dtype=float)})
+    ganhos = pd.concat([parte for parte in (por_hora, fixos) if not parte.empty] or [por_hora]).groupby('Mês')[['Horas', 'Valor']].sum()
+    ganhos.index = pd.PeriodIndex.from_ordinals(ganhos.index.to_numpy(dtype='int64'), freq='M').rename('Mês')
+    return ganhos
+
+def ganhos_mes(ganhos, ano, mes):
+    periodo = pd.Period(year=ano, month=mes, freq='M')
+    return ganhos.loc[periodo].to_dict() if periodo in ganhos.index else {'Horas': 0.0, 'Valor': 0.0}
+
+def tendencia(ganhos, ano, mes, meses=6):
+    periodos = pd.period_range(end=pd.Period(year=ano, month=mes, freq='M'), periods=meses, freq='M')
+    recorte = ganhos.reindex(periodos, fill_value=0.0)
+    return pd.DataFrame({'Mês': periodos.strftime('%m/%Y'), 'Horas': recorte['Horas'].to_numpy(), 'Valor': recorte['Valor'].to_numpy()})
+
+
+# --- Ações (recebem os Conjuntos de compartilhado.py; devolvem os ids efetivamente alterados) ---
+def _fechar_intervalos(dados_freelas, dados_intervalos, ids, agora):
+    freelas, _ = dados_freelas.vista(); intervalos, _ = dados_intervalos.vista()
+    abertos = intervalos.index[intervalos['Trabalho'].isin(ids) & intervalos['Fim'].isna()]
+    dados_intervalos.atualizar_lote({id_: {'Fim': agora} for id_ in abertos})
+    sem_intervalos = pd.Index(ids).difference(intervalos['Trabalho'].dropna())  # trabalho antigo: grava o intervalo implícito
+    if len(sem_intervalos): dados_intervalos.inserir(pd.DataFrame({'Trabalho': sem_intervalos, 'Início': freelas.loc[sem_intervalos, 'Início'].to_numpy(), 'Fim': agora}))
+
+def iniciar(dados_freelas, dados_intervalos, trabalho, agora):
+    """Cria o trabalho (dict com Descrição, Modo de Cobrança, Valor da Hora e Valor Fixo) e abre o primeiro intervalo."""
+    with _trava:
+        novo = dados_freelas.inserir(pd.DataFrame([{**trabalho, 'Status': EM_ANDAMENTO, 'Início': agora, 'Término': pd.NaT, 'Valor a Receber': 0.0}]))
+        dados_intervalos.inserir(pd.DataFrame({'Trabalho': novo.index, 'Início': agora, 'Fim': pd.NaT}))
+        return novo.index.tolist()
+
+def pausar(dados_freelas, dados_intervalos, ids, agora):
+    with _trava:
+        pausados = dados_freelas.atualizar_lote({id_: {'Status': PAUSADO} for id_ in ids}, esperado={'Status': EM_ANDAMENTO})
+        _fechar_intervalos(dados_freelas, dados_intervalos, pausados, agora)
+        return pausados
+
+def retomar(dados_freelas, dados_intervalos, ids, agora):
+    with _trava:
+        retomados = dados_freelas.atualizar_lote({id_: {'Status': EM_ANDAMENTO} for id_ in ids}, esperado={'Status': PAUSADO})
+        if retomados: dados_intervalos.inserir(pd.DataFrame({'Trabalho': retomados, 'Início': agora, 'Fim': pd.NaT}))
+        return retomados
+
+def finalizar(dados_freelas, dados_intervalos, ids, agora):
+    """Fecha os intervalos e grava Término e o Valor a Receber calculado pelas horas trabalhadas."""
+    with _trava:
+        freelas, _ = dados_freelas.vista()
+        ativos = freelas.index.intersection(ids)
+        ativos = ativos[freelas.loc[ativos, 'Status'].isin(ATIVOS).to_numpy()]
+        if ativos.empty: return []
+        _fechar_intervalos(dados_freelas, dados_intervalos, ativos[(freelas.loc[ativos, 'Status'] == EM_ANDAMENTO).to_numpy()], agora)
+        valores = calcular(freelas.loc[ativos], dados_intervalos.vista()[0], agora)['Valor Acumulado']
+        return dados_freelas.atualizar_lote({id_: {'Status': CONCLUIDO, 'Término': agora, 'Valor a Receber': float(valores[id_])} for id_ in ativos}, esperado={'Status': ATIVOS})
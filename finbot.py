@@ -0,0 +1,63 @@
+import time
+
+import categorizacao
+
+# --- FINBOT: RESPOSTA EM FLUXO COM CONTEXTO LIMITADO ---
+# O histórico enviado ao modelo cabe em ORCAMENTO_TOKENS: as mensagens mais recentes vão inteiras e
+# as mais antigas são condensadas num resumo curto dentro do prompt de sistema. O resumo financeiro
+# sai dos totais do IndicePeriodo, sem somar as transações de novo.
+
+ORCAMENTO_TOKENS = 1500    # histórico (mensagens + resumo das antigas)
+MENSAGENS_MINIMAS = 2      # a última pergunta e a resposta anterior sempre vão inteiras
+TAMANHO_RESUMO_ANTIGAS = 600
+
+
+def estimar_tokens(texto):
+    return len(texto) // 4 + 1  # aproximação de ~4 caracteres por token
+
+def resumo_financeiro(indice, ano, mes, nome_mes):
+    totais = indice.totais_mes(ano, mes)
+    resumo = f"Receita no mês de {nome_mes}: R${totais['Receita']:,.2f}; Despesa: R${totais['Despesa']:,.2f}; Saldo: R${totais['Receita'] - totais['Despesa']:,.2f}"
+    despesas = indice.por_categoria(ano, mes, 'Despesa')
+    if not despesas.empty:
+        maiores = despesas.groupby('Categoria')['Valor'].sum().nlargest(3)
+        resumo += "; Maiores gastos: " + ", ".join(f"{cat or 'Sem categoria'} (R${valor:,.2f})" for cat, valor in maiores.items())
+    tendencia = indice.tendencia(ano, mes, meses=3)
+    resumo += f"; Média dos últimos 3 meses: receita R${tendencia['Receita'].mean():,.2f}, despesa R${tendencia['Despesa'].mean():,.2f}"
+    return resumo
+
+def montar_mensagens(historico_conversa, resumo_financeiro_atual):
+    """Seleciona as mensagens recentes que cabem no orçamento e resume as demais."""
+    recentes, usados = [], 0
+    for mensagem in reversed(historico_conversa):
+        custo = estimar_tokens(mensagem['content'])
+        if len(recentes) >= MENSAGENS_MINIMAS and usados + custo > ORCAMENTO_TOKENS: break
+        recentes.append(mensagem); usados += custo
+    recentes.reverse()
+    antigas = historico_conversa[:len(historico_conversa) - len(recentes)]
+    prompt_sistema = (f"Você é FinBot, um assistente financeiro educativo. Use o seguinte resumo financeiro do usuário para personalizar suas respostas: {resumo_financeiro_atual}. Dê noções gerais sobre investimentos. Sempre inclua um aviso para procurar um profissional e NUNCA se apresente como um conselheiro licenciado.")
+    perguntas_antigas = []
+    for mensagem in reversed(antigas):  # as perguntas antigas mais recentes têm prioridade no resumo
+        if mensagem['role'] != 'user': continue
+        pergunta = mensagem['content'].strip().replace('\n', ' ')[:120]
+        if sum(len(p) + 2 for p in perguntas_antigas) + len(pergunta) > TAMANHO_RESUMO_ANTIGAS: break
+        perguntas_antigas.insert(0, pergunta)
+    if perguntas_antigas:
+        resumo_conversa = "; ".join(perguntas_antigas)
+        prompt_sistema += f" Resumo da conversa anterior (perguntas já feitas pelo usuário): {resumo_conversa}."
+    return [{"role": "system", "content": prompt_sistema}, *({"role": m['role'], "content": m['content']} for m in recentes)]
+
+def responder_em_fluxo(historico_conversa, resumo_financeiro_atual, api_key, metricas=None):
+    """Gera a resposta em pedaços conforme chegam. Em `metricas` ficam o tamanho do prompt,
+    o tempo até o primeiro token e o tempo total (ms)."""
+    metricas = {} if metricas is None else metricas
+    mensagens = montar_mensagens(historico_conversa, resumo_financeiro_atual)
+    metricas.update(mensagens_enviadas=len(mensagens) - 1, tokens_prompt=sum(estimar_tokens(m['content']) for m in mensagens))
+    inicio = time.perf_counter()
+    fluxo = categorizacao.obter_cliente(api_key).chat.completions.create(messages=mensagens, model=categorizacao.MODELO, temperature=0.7, stream=True)
+    for pedaco in fluxo:
+        texto = pedaco.choices[0].delta.content if pedaco.choices else None
+        if not texto: continue
+        metricas.setdefault('ttft_ms', (time.perf_counter() - inicio) * 1000)
+        yield texto
+    metricas['total_ms'] = (time.perf_counter() - inicio) * 1000
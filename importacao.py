@@ -0,0 +1,109 @@
+import io
+import re
+from collections import Counter
+
+import pandas as pd
+
+import categorizacao
+from armazenamento import COLUNAS_TRANSACOES
+
+# --- IMPORTAÇÃO DE EXTRATOS (CSV/OFX) ---
+# O arquivo é lido em blocos; cada bloco é deduplicado contra as transações existentes, categorizado
+# em lotes (categorizacao.categorizar_em_lotes) e gravado com um único registro no diário.
+
+TAMANHO_BLOCO = 2000
+NOMES_DATA = ['data', 'date', 'data lancamento', 'data do lancamento', 'data movimento', 'dtposted']
+NOMES_DESCRICAO = ['descricao', 'historico', 'lancamento', 'memo', 'description', 'detalhes', 'estabelecimento', 'name']
+NOMES_VALOR = ['valor', 'amount', 'value', 'valor r', 'trnamt']
+
+
+def _achar_coluna(colunas, candidatos):
+    normalizadas = {categorizacao.normalizar(c): c for c in colunas}
+    for candidato in candidatos:
+        if candidato in normalizadas: return normalizadas[candidato]
+    for candidato in candidatos:
+        for normalizada, original in normalizadas.items():
+            if normalizada.startswith(candidato): return original
+    raise ValueError(f"Coluna de '{candidatos[0]}' não encontrada no extrato. Colunas: {list(colunas)}")
+
+def _padronizar(datas, descricoes, valores):
+    """Converte um bloco bruto para o esquema das transações; valores negativos viram Despesa.
+    Linhas com data ou valor ilegível ficam com NaN/NaT (importar_extrato as conta como descartadas)."""
+    valores = pd.Series(valores).reset_index(drop=True)
+    return pd.DataFrame({'Data/Hora': pd.Series(datas).reset_index(drop=True), 'Descrição': pd.Series(descricoes).reset_index(drop=True).astype(str).str.strip(),
+                         'Valor': valores.abs(), 'Tipo': valores.lt(0).map({True: 'Despesa', False: 'Receita'})})
+
+def _numero_br(serie):
+    """'1.234,56', '1234,5', '1,234.56', '1.234' (milhar) e '-12.30' viram float; o resto vira NaN."""
+    texto = serie.astype(str).str.replace(r'[R$\s]', '', regex=True)
+    virgula_decimal = texto.str.contains(r',\d{1,2}$')
+    ponto_milhar = texto.str.match(r'^[-+]?\d{1,3}(\.\d{3})+$')
+    texto = texto.where(~(virgula_decimal | ponto_milhar), texto.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    texto = texto.where(virgula_decimal | ponto_milhar, texto.str.replace(',', '', regex=False))  # vírgula de milhar: 1,234.56
+    return pd.to_numeric(texto, errors='coerce')
+
+def _blocos_csv(texto):
+    primeira_linha = texto.split('\n', 1)[0]
+    separador = ';' if primeira_linha.count(';') > primeira_linha.count(',') else ','
+    leitor = pd.read_csv(io.StringIO(texto), sep=separador, dtype=str, chunksize=TAMANHO_BLOCO, skipinitialspace=True)
+    colunas = None
+    for bloco in leitor:
+        if colunas is None:
+            colunas = (_achar_coluna(bloco.columns, NOMES_DATA), _achar_coluna(bloco.columns, NOMES_DESCRICAO), _achar_coluna(bloco.columns, NOMES_VALOR))
+        col_data, col_descricao, col_valor = colunas
+        datas = pd.to_datetime(bloco[col_data], errors='coerce', dayfirst=not bloco[col_data].astype(str).str.match(r'^\d{4}-').all())
+        yield _padronizar(datas, bloco[col_descricao].fillna(''), _numero_br(bloco[col_valor]))
+
+def _blocos_ofx(texto):
+    transacoes = []
+    for bloco in re.finditer(r'<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))', texto, re.S | re.I):
+        campos = dict((chave.upper(), valor.strip()) for chave, valor in re.findall(r'<(\w+)>([^<\r\n]*)', bloco.group(1)))
+        transacoes.append((campos.get('DTPOSTED', '')[:8], campos.get('MEMO') or campos.get('NAME', ''), campos.get('TRNAMT', '')))
+        if len(transacoes) == TAMANHO_BLOCO: yield _bloco_ofx(transacoes); transacoes = []
+    if transacoes: yield _bloco_ofx(transacoes)
+
+def _bloco_ofx(transacoes):
+    datas, descricoes, valores = zip(*transacoes)
+    return _padronizar(pd.to_datetime(pd.Series(datas), format='%Y%m%d', errors='coerce'), descricoes, _numero_br(pd.Series(valores)))
+
+def ler_extrato(conteudo, nome_arquivo):
+    """Gera blocos de transações (Data/Hora, Descrição, Valor, Tipo) a partir de um extrato CSV ou OFX."""
+    if isinstance(conteudo, bytes):
+        try: conteudo = conteudo.decode('utf-8-sig')
+        except UnicodeDecodeError: conteudo = conteudo.decode('latin-1')
+    if nome_arquivo.lower().endswith('.ofx') or '<OFX>' in conteudo[:4096].upper(): return _blocos_ofx(conteudo)
+    return _blocos_csv(conteudo)
+
+
+def _chaves_duplicidade(df):
+    datas = pd.to_datetime(df['Data/Hora'], errors='coerce', format='ISO8601').dt.strftime('%Y-%m-%d')
+    descricoes = df['Descrição'].astype(str).map(categorizacao.normalizar)
+    return list(zip(datas, descricoes, pd.to_numeric(df['Valor'], errors='coerce').round(2), df['Tipo'].astype(str)))
+
+def importar_extrato(conjunto, conteudo, nome_arquivo, api_key, ao_progredir=None):
+    """Importa um extrato inteiro no Conjunto de transações. Devolve (novas linhas gravadas, resumo).
+    Uma linha é duplicada quando (dia, descrição normalizada, valor, tipo) já existe; se a mesma chave
+    aparece k vezes nas transações, as k primeiras ocorrências do extrato são ignoradas."""
+    df_transacoes, _ = conjunto.vista()
+    existentes = Counter(_chaves_duplicidade(df_transacoes)) if not df_transacoes.empty else Counter()
+    resumo = {'lidas': 0, 'descartadas': 0, 'duplicadas': 0, 'importadas': 0, 'lotes_com_falha': 0}
+    gravadas = []
+    for numero, bloco in enumerate(ler_extrato(conteudo, nome_arquivo), start=1):
+        resumo['lidas'] += len(bloco)
+        validas = bloco.dropna(subset=['Data/Hora', 'Valor'])
+        resumo['descartadas'] += len(bloco) - len(validas); bloco = validas
+        manter = []
+        for chave in _chaves_duplicidade(bloco):
+            if existentes[chave] > 0: existentes[chave] -= 1; manter.append(False)
+            else: manter.append(True)
+        novas = bloco[manter]
+        resumo['duplicadas'] += len(bloco) - len(novas)
+        if novas.empty: continue
+        rotulos, falhas = categorizacao.categorizar_em_lotes(novas['Descrição'].tolist(), api_key)
+        resumo['lotes_com_falha'] += falhas
+        novas = novas.assign(Categoria=novas['Descrição'].map(lambda d: rotulos[d][0]), Subcategoria=novas['Descrição'].map(lambda d: rotulos[d][1]))
+        novas['Descrição da IA'] = novas['Categoria'] + ' -> ' + novas['Subcategoria']
+        gravadas.append(conjunto.inserir(novas[COLUNAS_TRANSACOES]))
+        resumo['importadas'] += len(novas)
+        if ao_progredir: ao_progredir(numero, resumo)
+    return (pd.concat(gravadas) if gravadas else df_transacoes.iloc[0:0]), resumo
@@ -0,0 +1,73 @@
+import pandas as pd
+
+# --- ÍNDICE POR PERÍODO ---
+# Agrupa os ids das transações por (ano, mês) e mantém os totais por mês/tipo/categoria/subcategoria.
+# Inclusões e exclusões atualizam só os meses afetados, então navegar entre meses custa O(linhas do mês)
+# em vez de reconverter e filtrar o histórico inteiro a cada rerun.
+
+CAMPOS_TOTAIS = ['Tipo', 'Categoria', 'Subcategoria']
+
+
+def _chaves(df):
+    datas = pd.to_datetime(df['Data/Hora'], errors='coerce', format='ISO8601')
+    chaves = pd.DataFrame({'ano': datas.dt.year, 'mes': datas.dt.month}, index=df.index)
+    for col in CAMPOS_TOTAIS:
+        valores = df[col] if col in df.columns else pd.Series(index=df.index, dtype=object)
+        chaves[col] = valores.astype(object).where(valores.notna(), '')
+    chaves['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0)
+    return chaves[datas.notna()].astype({'ano': int, 'mes': int})
+
+
+class IndicePeriodo:
+    def __init__(self, df):
+        self._linhas = {}  # (ano, mes) -> ids das linhas
+        self._totais = {}  # (ano, mes) -> {(tipo, categoria, subcategoria): soma}
+        self.adicionar(df)
+
+    def _acumular(self, df, sinal):
+        # Os meses afetados ganham conjuntos/dicionários novos em vez de serem alterados no lugar:
+        # o índice é compartilhado entre sessões e outra thread pode estar lendo o mês antigo.
+        chaves = _chaves(df)
+        if chaves.empty: return
+        for (ano, mes), grupo in chaves.groupby(['ano', 'mes']).groups.items():
+            ids = set(self._linhas.get((ano, mes), ()))
+            if sinal > 0: ids.update(grupo)
+            else: ids.difference_update(grupo)
+            self._linhas[(ano, mes)] = ids
+        somas = chaves.groupby(['ano', 'mes', *CAMPOS_TOTAIS])['Valor'].sum()
+        novos_totais = {}
+        for (ano, mes, *chave), valor in somas.items():
+            if (ano, mes) not in novos_totais: novos_totais[(ano, mes)] = dict(self._totais.get((ano, mes), {}))
+            totais = novos_totais[(ano, mes)]
+            novo = totais.get(tuple(chave), 0.0) + sinal * valor
+            if abs(novo) < 1e-9: totais.pop(tuple(chave), None)
+            else: totais[tuple(chave)] = novo
+        self._totais.update(novos_totais)
+        for periodo in {(ano, mes) for ano, mes, *_ in somas.index}:
+            if not self._linhas.get(periodo): self._linhas.pop(periodo, None); self._totais.pop(periodo, None)
+
+    def adicionar(self, df_novas): self._acumular(df_novas, 1)
+    def remover(self, df_removidas): self._acumular(df_removidas, -1)
+
+    def linhas_mes(self, df, ano, mes):
+        ids = self._linhas.get((ano, mes))
+        if not ids: return df.iloc[0:0]
+        return df.loc[df.index.intersection(sorted(ids))]
+
+    def totais_mes(self, ano, mes):
+        resumo = {'Receita': 0.0, 'Despesa': 0.0}
+        for (tipo, _, _), valor in self._totais.get((ano, mes), {}).items():
+            if tipo in resumo: resumo[tipo] += valor
+        return resumo
+
+    def por_categoria(self, ano, mes, tipo='Despesa'):
+        linhas = [(cat, sub, valor) for (t, cat, sub), valor in self._totais.get((ano, mes), {}).items() if t == tipo]
+        return pd.DataFrame(linhas, columns=['Categoria', 'Subcategoria', 'Valor'])
+
+    def tendencia(self, ano, mes, meses=6):
+        fim = pd.Period(year=ano, month=mes, freq='M')
+        linhas = []
+        for periodo in pd.period_range(end=fim, periods=meses, freq='M'):
+            totais = self.totais_mes(periodo.year, periodo.month)
+            linhas.append({'Mês': periodo.strftime('%m/%Y'), **totais, 'Saldo': totais['Receita'] - totais['Despesa']})
+        return pd.DataFrame(linhas)
@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+import pandas as pd
+
+# --- RASTREAMENTO DOS RERUNS ---
+# medir("nome") cronometra um trecho do rerun atual (cada sessão do Streamlit roda o script na sua
+# própria thread, então os trechos ficam em um threading.local). Ao fim do rerun os tempos vão, numa
+# única linha JSON, para um log rotativo e para uma janela em memória usada pela aba de diagnóstico.
+# Custo por trecho: dois perf_counter e um append. Desligue com FINANCAS_RASTREAMENTO=0.
+# Um rerun interrompido por st.rerun() deve chamar finalizar_rerun antes (ver reiniciar() no app.py):
+# os trechos ainda abertos entram no registro com o tempo até ali.
+
+ATIVO = os.environ.get('FINANCAS_RASTREAMENTO', '1') != '0'
+CAMINHO_LOG = 'rastreamento.log'
+RERUNS_GUARDADOS = 300
+INTERVALO_MEMORIA_PROFUNDA = 20  # a cada N reruns mede a memória com deep=True (percorre strings)
+
+_reruns = deque(maxlen=RERUNS_GUARDADOS)
+_local = threading.local()
+_trava = threading.Lock()
+_contador = 0
+_logger = None
+
+
+def _obter_logger():
+    global _logger
+    with _trava:
+        if _logger is None:
+            _logger = logging.getLogger('financas.rastreamento')
+            _logger.setLevel(logging.INFO); _logger.propagate = False
+            if not _logger.handlers:
+                manipulador = RotatingFileHandler(CAMINHO_LOG, maxBytes=2_000_000, backupCount=3, encoding='utf-8', delay=True)
+                manipulador.setFormatter(logging.Formatter('%(message)s'))
+                _logger.addHandler(manipulador)
+        return _logger
+
+def iniciar_rerun():
+    if ATIVO: _local.spans, _local.abertos, _local.inicio = [], [], time.perf_counter()
+
+@contextmanager
+def medir(nome):
+    spans = getattr(_local, 'spans', None) if ATIVO else None
+    if spans is None: yield; return
+    aberto = (nome, time.perf_counter()); _local.abertos.append(aberto)
+    try: yield
+    finally:
+        if _local.spans is spans:  # senão o rerun já foi fechado com este trecho incluído
+            _local.abertos.remove(aberto); spans.append((nome, (time.perf_counter() - aberto[1]) * 1000))
+
+def memoria_dataframes(estado, profunda=False):
+    return {chave: int(valor.memory_usage(index=True, deep=profunda).sum()) for chave, valor in estado.items() if isinstance(valor, pd.DataFrame)}
+
+def finalizar_rerun(estado):
+    """Fecha o rerun atual: registra o tempo total, a memória dos DataFrames em `estado` e grava no log."""
+    global _contador
+    spans = getattr(_local, 'spans', None) if ATIVO else None
+    if spans is None: return
+    agora = time.perf_counter()
+    spans.extend((nome, (agora - inicio) * 1000) for nome, inicio in reversed(_local.abertos))
+    spans.append(('rerun', (agora - _local.inicio) * 1000))
+    with _trava: _contador += 1; numero = _contador
+    profunda = numero % INTERVALO_MEMORIA_PROFUNDA == 1
+    registro = {'momento': datetime.now().isoformat(timespec='milliseconds'), 'rerun': numero, 'spans': [[nome, round(ms, 3)] for nome, ms in spans],
+                'memoria': memoria_dataframes(estado, profunda), 'memoria_profunda': profunda}
+    with _trava: _reruns.append(registro)
+    _obter_logger().info(json.dumps(registro, ensure_ascii=False))
+    _local.spans, _local.abertos = None, []
+
+def resumo():
+    """p50/p95/máximo (ms) por trecho nos últimos RERUNS_GUARDADOS reruns do processo."""
+    with _trava: registros = list(_reruns)
+    linhas = [(nome, ms) for registro in registros for nome, ms in registro['spans']]
+    if not linhas: return pd.DataFrame(columns=['Trecho', 'Chamadas', 'p50 (ms)', 'p95 (ms)', 'Máximo (ms)'])
+    tempos = pd.DataFrame(linhas, columns=['Trecho', 'ms']).groupby('Trecho')['ms']
+    tabela = pd.DataFrame({'Chamadas': tempos.count(), 'p50 (ms)': tempos.quantile(0.5), 'p95 (ms)': tempos.quantile(0.95), 'Máximo (ms)': tempos.max()})
+    return tabela.sort_values('p95 (ms)', ascending=False).round(2).reset_index()
+
+def ultima_memoria():
+    with _trava: registros = list(_reruns)
+    for registro in reversed(registros):
+        if registro['memoria_profunda']: return registro['memoria'], registro['momento']
+    return (registros[-1]['memoria'], registros[-1]['momento']) if registros else ({}, None)
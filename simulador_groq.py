@@ -0,0 +1,94 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- SIMULADOR LOCAL DO ENDPOINT DA GROQ ---
+# Responde em /openai/v1/chat/completions no mesmo formato da API, para testar a categorização
+# (individual e em lote) e o FinBot (inclusive em fluxo, stream=True) sem rede. Uso:
+#   python simulador_groq.py --porta 8765
+#   GROQ_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+
+PALAVRAS_CHAVE = {
+    'Transporte': ['uber', '99', 'taxi', 'onibus', 'metro', 'combustivel', 'posto', 'gasolina'],
+    'Alimentação': ['mercado', 'supermercado', 'padaria', 'restaurante', 'ifood', 'lanche', 'cafe'],
+    'Moradia': ['aluguel', 'condominio', 'luz', 'energia', 'agua', 'internet', 'gas'],
+    'Saúde': ['farmacia', 'drogaria', 'consulta', 'medico', 'exame', 'dentista'],
+    'Lazer': ['cinema', 'netflix', 'spotify', 'show', 'bar', 'viagem'],
+    'Educação': ['curso', 'livro', 'escola', 'faculdade', 'udemy'],
+    'Salário': ['salario', 'pagamento', 'folha', 'pix recebido'],
+    'Investimentos': ['cdb', 'tesouro', 'acoes', 'aplicacao', 'fii'],
+    'Compras': ['loja', 'amazon', 'mercado livre', 'shopee', 'roupa'],
+}
+
+
+def classificar(descricao):
+    texto = descricao.lower()
+    for categoria, palavras in PALAVRAS_CHAVE.items():
+        for palavra in palavras:
+            if palavra in texto: return categoria, palavra.capitalize()
+    return 'Outros', 'N/A'
+
+
+class Simulador(BaseHTTPRequestHandler):
+    latencia = 0.0     # segundos por requisição
+    taxa_falhas = 0.0  # fração das requisições respondidas com 429
+
+    def log_message(self, *args): pass
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status); self.send_header('Content-Type', 'application/json'); self.send_header('Content-Length', str(len(dados)))
+        self.end_headers(); self.wfile.write(dados)
+
+    def _responder_fluxo(self, pedido, conteudo):
+        """Envia a resposta como server-sent events, uma palavra por pedaço."""
+        self.send_response(200); self.send_header('Content-Type', 'text/event-stream'); self.end_headers()
+        base = {'id': 'sim-1', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': pedido.get('model', '')}
+        for palavra in conteudo.split(' '):
+            pedaco = {**base, 'choices': [{'index': 0, 'delta': {'content': palavra + ' '}, 'finish_reason': None}]}
+            self.wfile.write(f"data: {json.dumps(pedaco, ensure_ascii=False)}\n\n".encode('utf-8')); self.wfile.flush()
+            time.sleep(self.latencia / 20)
+        final = {**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode('utf-8')); self.wfile.flush()
+
+    def do_POST(self):
+        pedido = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        time.sleep(self.latencia)
+        if random.random() < self.taxa_falhas:
+            return self._responder(429, {'error': {'message': 'Rate limit simulado', 'type': 'rate_limit_exceeded'}})
+        mensagens = pedido.get('messages', [])
+        ultima = mensagens[-1]['content'] if mensagens else ''
+        if pedido.get('response_format', {}).get('type') == 'json_object':
+            if '\n' in ultima and ultima.split('\n', 1)[1].lstrip().startswith('['):
+                itens = json.loads(ultima.split('\n', 1)[1])
+                conteudo = {'itens': [dict(zip(['categoria', 'subcategoria'], classificar(item['descricao'])), id=item['id']) for item in itens]}
+            else: conteudo = dict(zip(['categoria', 'subcategoria'], classificar(ultima)))
+            conteudo = json.dumps(conteudo, ensure_ascii=False)
+        else: conteudo = f"(simulador) Você perguntou: {ultima}. Procure sempre um profissional certificado."
+        if pedido.get('stream'): return self._responder_fluxo(pedido, conteudo)
+        self._responder(200, {'id': 'sim-1', 'object': 'chat.completion', 'created': int(time.time()), 'model': pedido.get('model', ''),
+                              'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': conteudo}}],
+                              'usage': {'prompt_tokens': sum(len(m.get('content', '')) for m in mensagens) // 4, 'completion_tokens': len(conteudo) // 4, 'total_tokens': 0}})
+
+
+def iniciar(porta=0, latencia=0.0, taxa_falhas=0.0):
+    """Sobe o simulador numa thread e devolve o servidor (a URL base é f"http://127.0.0.1:{servidor.server_port}")."""
+    manipulador = type('SimuladorConfigurado', (Simulador,), {'latencia': latencia, 'taxa_falhas': taxa_falhas})
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), manipulador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulador local do endpoint de chat da Groq")
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--latencia', type=float, default=0.0, help="segundos de espera por requisição")
+    parser.add_argument('--falhas', type=float, default=0.0, help="fração de respostas 429")
+    argumentos = parser.parse_args()
+    servidor = iniciar(argumentos.porta, argumentos.latencia, argumentos.falhas)
+    print(f"Simulador em http://127.0.0.1:{servidor.server_port} (GROQ_BASE_URL)")
+    try: threading.Event().wait()
+    except KeyboardInterrupt: servidor.shutdown()
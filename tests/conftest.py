@@ -0,0 +1,30 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import armazenamento
+
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    """Diretório vazio como pasta de dados, sem diários de outros testes no processo."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(armazenamento, 'FORMATO', 'csv')
+    armazenamento._diarios.clear()
+    yield tmp_path
+    aguardar_compactacao()
+    armazenamento._diarios.clear()
+
+def aguardar_compactacao():
+    for thread in threading.enumerate():
+        if thread.name.startswith('compactar '): thread.join()
+
+def recarregar(carregador):
+    """Carrega como um processo recém-iniciado."""
+    aguardar_compactacao()
+    armazenamento._diarios.clear()
+    return carregador()
@@ -0,0 +1,86 @@
+import json
+from datetime import datetime
+
+import pandas as pd
+
+import armazenamento
+from conftest import aguardar_compactacao, recarregar
+
+CAMINHO = 'reserva_movimentacoes.csv'
+
+
+def movimentacoes(n, inicio=0):
+    return pd.DataFrame({'Data': [datetime(2024, 1, 1 + i % 28) for i in range(inicio, inicio + n)], 'Tipo': 'Aporte', 'Valor': [float(i) for i in range(inicio, inicio + n)]})
+
+def inserir(df, n, inicio=0):
+    for i in range(inicio, inicio + n): df = armazenamento.inserir_registros(df, movimentacoes(1, i), CAMINHO)
+    return df
+
+
+def test_ids_estaveis_apos_compactacao(pasta):
+    df = inserir(armazenamento.carregar_reserva_movimentacoes(), 10)
+    df = armazenamento.excluir_registros(df, [2, 5], CAMINHO)
+    armazenamento.obter_diario(CAMINHO).compactar()
+    df = inserir(df, 1, 10)
+    relido = recarregar(armazenamento.carregar_reserva_movimentacoes)
+    assert relido.index.tolist() == [0, 1, 3, 4, 6, 7, 8, 9, 10]
+    assert relido['Valor'].tolist() == df['Valor'].tolist()
+
+def test_linha_cortada_no_fim_do_diario_e_descartada(pasta):
+    inserir(armazenamento.carregar_reserva_movimentacoes(), 3)
+    diario = armazenamento.obter_diario(CAMINHO)
+    tamanho = len(open(diario.caminho_diario, 'rb').read())
+    with open(diario.caminho_diario, 'a') as f: f.write('{"op": "ins", "ids": [3')
+    relido = recarregar(armazenamento.carregar_reserva_movimentacoes)
+    assert relido.index.tolist() == [0, 1, 2]
+    assert len(open(diario.caminho_diario, 'rb').read()) == tamanho  # a linha cortada foi truncada
+    relido = armazenamento.inserir_registros(relido, movimentacoes(1, 3), CAMINHO)
+    assert recarregar(armazenamento.carregar_reserva_movimentacoes).index.tolist() == [0, 1, 2, 3]
+
+def test_compactacao_interrompida_e_concluida(pasta):
+    df = inserir(armazenamento.carregar_reserva_movimentacoes(), 5)
+    diario = armazenamento.obter_diario(CAMINHO)
+    # queda entre as duas trocas: o snapshot novo já está no lugar, o diário novo ainda em .tmp
+    assinatura = diario._snapshot.gravar(df.drop(index=[0, 1]), diario.caminho)
+    with open(diario.caminho_diario + '.tmp', 'w') as f:
+        f.write(json.dumps({'op': 'base', 'crc': assinatura, 'ids': armazenamento._faixas(df.index[2:]), 'proximo': 5}) + '\n')
+    relido = recarregar(armazenamento.carregar_reserva_movimentacoes)
+    assert relido.index.tolist() == [2, 3, 4]
+    assert not (pasta / (CAMINHO + '.diario.tmp')).exists()
+
+def test_compactacao_interrompida_antes_da_troca_e_descartada(pasta):
+    inserir(armazenamento.carregar_reserva_movimentacoes(), 5)
+    diario = armazenamento.obter_diario(CAMINHO)
+    with open(diario.caminho_diario + '.tmp', 'w') as f: f.write(json.dumps({'op': 'base', 'crc': 123, 'ids': None, 'proximo': 5}) + '\n')
+    with open(diario.caminho + '.tmp', 'w') as f: f.write('Data,Tipo,Valor\n')
+    relido = recarregar(armazenamento.carregar_reserva_movimentacoes)
+    assert relido.index.tolist() == [0, 1, 2, 3, 4]
+    assert not (pasta / (CAMINHO + '.diario.tmp')).exists() and not (pasta / (CAMINHO + '.tmp')).exists()
+
+def test_snapshot_editado_por_fora_mantem_as_inclusoes(pasta):
+    df = inserir(armazenamento.carregar_reserva_movimentacoes(), 4)
+    armazenamento.obter_diario(CAMINHO).compactar()
+    df = inserir(df, 3, 4)
+    df = armazenamento.excluir_registros(df, [0, 5], CAMINHO)
+    aguardar_compactacao()
+    pd.read_csv(CAMINHO).assign(Valor=lambda d: d['Valor'] * 10).to_csv(CAMINHO, index=False)  # edição numa planilha
+    relido = recarregar(armazenamento.carregar_reserva_movimentacoes)
+    assert relido['Valor'].tolist() == [0.0, 10.0, 20.0, 30.0, 4.0, 6.0]  # a exclusão do 0 se perdeu; a do 5 não
+    avisos = armazenamento.avisos_pendentes()
+    assert len(avisos) == 1 and '2 lançamento(s)' in avisos[0] and '1 exclusão' in avisos[0]
+    assert armazenamento.avisos_pendentes() == []
+    assert (pasta / (CAMINHO + '.diario.descartado')).exists()
+    assert recarregar(armazenamento.carregar_reserva_movimentacoes)['Valor'].tolist() == relido['Valor'].tolist()
+
+def test_cabecalho_de_diario_novo_guarda_o_proximo_id_anterior(pasta):
+    inserir(armazenamento.carregar_reserva_movimentacoes(), 2)
+    cabecalho, registro = [json.loads(linha) for linha in open(armazenamento.obter_diario(CAMINHO).caminho_diario)][:2]
+    assert cabecalho['op'] == 'base' and cabecalho['proximo'] == 0 and registro['ids'] == [0]
+
+def test_alteracao_para_vazio_sobrevive_a_recarga(pasta):
+    caminho = 'freelancer_intervalos.csv'
+    df = armazenamento.carregar_freelas_intervalos()
+    df = armazenamento.inserir_registros(df, pd.DataFrame({'Trabalho': [1], 'Início': [datetime(2024, 1, 1, 9)], 'Fim': [datetime(2024, 1, 1, 12)]}), caminho)
+    armazenamento.obter_diario(caminho).compactar()  # a linha passa para o snapshot; a alteração fica só no diário
+    armazenamento.atualizar_registros(df, {0: {'Fim': None}}, caminho)
+    assert recarregar(armazenamento.carregar_freelas_intervalos)['Fim'].isna().tolist() == [True]
@@ -0,0 +1,20 @@
+import pandas as pd
+
+import armazenamento
+import compartilhado
+
+
+def test_atualizar_nao_altera_as_vistas_das_outras_sessoes(pasta, monkeypatch):
+    monkeypatch.setattr(compartilhado, '_conjuntos', {})
+    dados = compartilhado.obter('transacoes')
+    dados.inserir(pd.DataFrame([[pd.Timestamp(2024, 5, i + 1), f'Compra {i}', 10.0, 'Despesa', 'Lazer', 'Geral', ''] for i in range(3)],
+                               columns=armazenamento.COLUNAS_TRANSACOES))
+    outra_sessao, versao = dados.vista()
+    assert dados.atualizar_lote({0: {'Categoria': 'Categoria Nova', 'Valor': 99.0}, 2: {'Descrição': 'Outra'}}) == [0, 2]
+    assert outra_sessao['Categoria'].tolist() == ['Lazer'] * 3
+    assert outra_sessao['Valor'].tolist() == [10.0] * 3
+    assert outra_sessao['Descrição'].tolist() == ['Compra 0', 'Compra 1', 'Compra 2']
+    atual, nova_versao = dados.vista()
+    assert nova_versao == versao + 1
+    assert atual['Categoria'].tolist() == ['Categoria Nova', 'Lazer', 'Lazer'] and atual.loc[2, 'Descrição'] == 'Outra'
+    assert dados.mudancas_desde(versao) == {(2024, 5)}
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import compartilhado
+import faturamento
+from faturamento import CONCLUIDO, EM_ANDAMENTO, PAUSADO, POR_HORA
+
+AGORA = datetime(2024, 3, 20, 12)
+
+
+def trabalhos(*linhas):
+    """(Status, Modo de Cobrança, Valor da Hora, Valor Fixo, Início, Término) -> DataFrame como o carregado do disco."""
+    df = pd.DataFrame(linhas, columns=['Status', 'Modo de Cobrança', 'Valor da Hora', 'Valor Fixo', 'Início', 'Término'])
+    return df.assign(Descrição=[f'Trabalho {i}' for i in range(len(df))]).astype({'Início': 'datetime64[us]', 'Término': 'datetime64[us]'})
+
+def intervalos(*linhas):
+    return pd.DataFrame(linhas, columns=['Trabalho', 'Início', 'Fim']).astype({'Trabalho': 'Int64', 'Início': 'datetime64[us]', 'Fim': 'datetime64[us]'})
+
+def mes(ganhos, ano, numero): return faturamento.ganhos_mes(ganhos, ano, numero)
+
+
+def test_intervalo_que_atravessa_o_mes_divide_as_horas():
+    freelas = trabalhos((EM_ANDAMENTO, POR_HORA, 50.0, 0.0, datetime(2024, 1, 31, 22), None))
+    ganhos = faturamento.receita_mensal(freelas, intervalos((0, datetime(2024, 1, 31, 22), datetime(2024, 2, 1, 3))), AGORA)
+    assert mes(ganhos, 2024, 1) == {'Horas': 2.0, 'Valor': 100.0}
+    assert mes(ganhos, 2024, 2) == {'Horas': 3.0, 'Valor': 150.0}
+    assert faturamento.calcular(freelas, intervalos((0, datetime(2024, 1, 31, 22), datetime(2024, 2, 1, 3))), AGORA).loc[0].tolist() == [5.0, 250.0]
+
+def test_valor_fixo_conta_no_mes_do_termino():
+    freelas = trabalhos((CONCLUIDO, 'Valor Fixo', 0.0, 1000.0, datetime(2024, 1, 10, 9), datetime(2024, 3, 5, 18)),
+                        (EM_ANDAMENTO, 'Valor Fixo', 0.0, 500.0, datetime(2024, 3, 1, 9), None))
+    ganhos = faturamento.receita_mensal(freelas, intervalos(), AGORA)
+    assert mes(ganhos, 2024, 1)['Valor'] == 0.0 and mes(ganhos, 2024, 1)['Horas'] > 0
+    assert mes(ganhos, 2024, 3)['Valor'] == 1000.0  # o trabalho em andamento ainda não conta
+
+def test_trabalho_antigo_sem_intervalos():
+    freelas = trabalhos((CONCLUIDO, POR_HORA, 10.0, 0.0, datetime(2024, 2, 1, 8), datetime(2024, 2, 1, 12)),
+                        (EM_ANDAMENTO, POR_HORA, 10.0, 0.0, datetime(2024, 3, 20, 9), None),
+                        (CONCLUIDO, POR_HORA, 10.0, 0.0, datetime(2024, 2, 2, 8), None))  # sem término: zero horas
+    calculado = faturamento.calcular(freelas, intervalos(), AGORA)
+    assert calculado['Horas'].tolist() == [4.0, 3.0, 0.0]
+    assert calculado['Valor Acumulado'].tolist() == [40.0, 30.0, 0.0]
+    ganhos = faturamento.receita_mensal(freelas, intervalos(), AGORA)
+    assert mes(ganhos, 2024, 2) == {'Horas': 4.0, 'Valor': 40.0} and mes(ganhos, 2024, 3) == {'Horas': 3.0, 'Valor': 30.0}
+
+
+@pytest.fixture
+def dados(pasta, monkeypatch):
+    monkeypatch.setattr(compartilhado, '_conjuntos', {})
+    return compartilhado.obter('freelas'), compartilhado.obter('freelas_intervalos')
+
+def test_pausar_retomar_e_finalizar_em_base_vazia(dados):
+    dados_freelas, dados_intervalos = dados
+    [id_] = faturamento.iniciar(dados_freelas, dados_intervalos, {'Descrição': 'Site', 'Modo de Cobrança': POR_HORA, 'Valor da Hora': 100.0, 'Valor Fixo': 0.0},
+                                datetime(2024, 1, 31, 22))
+    assert faturamento.pausar(dados_freelas, dados_intervalos, [id_], datetime(2024, 2, 1, 1, 0, 0, 250000)) == [id_]
+    assert faturamento.pausar(dados_freelas, dados_intervalos, [id_], datetime(2024, 2, 1, 2)) == []  # já pausado
+    assert faturamento.retomar(dados_freelas, dados_intervalos, [id_], datetime(2024, 2, 1, 9, 0, 0, 500000)) == [id_]
+    assert faturamento.finalizar(dados_freelas, dados_intervalos, [id_], datetime(2024, 2, 1, 10, 0, 0, 500000)) == [id_]
+    freelas, _ = dados_freelas.vista(); intervalos_gravados, _ = dados_intervalos.vista()
+    assert freelas.loc[id_, 'Status'] == CONCLUIDO and freelas.loc[id_, 'Valor a Receber'] == pytest.approx(400.0, abs=0.01)
+    assert len(intervalos_gravados) == 2 and intervalos_gravados['Fim'].notna().all()
+    ganhos = faturamento.receita_mensal(freelas, intervalos_gravados, AGORA)
+    assert mes(ganhos, 2024, 1)['Horas'] == 2.0 and mes(ganhos, 2024, 2)['Horas'] == pytest.approx(2.0, abs=0.001)
+    assert mes(ganhos, 2024, 2)['Valor'] == pytest.approx(200.0, abs=0.01)
+
+def test_finalizar_trabalho_pausado(dados):
+    dados_freelas, dados_intervalos = dados
+    [id_] = faturamento.iniciar(dados_freelas, dados_intervalos, {'Descrição': 'Logo', 'Modo de Cobrança': 'Valor Fixo', 'Valor da Hora': 0.0, 'Valor Fixo': 800.0},
+                                datetime(2024, 3, 1, 9))
+    faturamento.pausar(dados_freelas, dados_intervalos, [id_], datetime(2024, 3, 1, 12))
+    assert faturamento.finalizar(dados_freelas, dados_intervalos, [id_], datetime(2024, 3, 10, 18, 30, 0, 123456)) == [id_]
+    assert faturamento.finalizar(dados_freelas, dados_intervalos, [id_], datetime(2024, 3, 11)) == []  # já concluído
+    freelas, _ = dados_freelas.vista(); intervalos_gravados, _ = dados_intervalos.vista()
+    assert len(intervalos_gravados) == 1  # o intervalo já estava fechado pela pausa
+    assert freelas.loc[id_, 'Término'] == pd.Timestamp(2024, 3, 10, 18, 30, 0, 123456) and freelas.loc[id_, 'Valor a Receber'] == 800.0
+    assert faturamento.calcular(freelas, intervalos_gravados, AGORA).loc[id_, 'Horas'] == 3.0
+    assert mes(faturamento.receita_mensal(freelas, intervalos_gravados, AGORA), 2024, 3) == {'Horas': 3.0, 'Valor': 800.0}
@@ -0,0 +1,56 @@
+import pytest
+
+import categorizacao
+import compartilhado
+import simulador_groq
+from importacao import importar_extrato
+
+CSV = """Data;Descrição;Valor
+05/03/2024;Uber Centro;-23,90
+05/03/2024;Padaria Pão Quente;-1.234,56
+06/03/2024;Pagamento Empresa;"1,234.56"
+07/03/2024;Cinema;abc
+data ruim;Farmácia;-10,00
+"""
+OFX = """<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240305120000<TRNAMT>-23.90<MEMO>Uber Centro</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240308120000<TRNAMT>-45.00<MEMO>Netflix Assinatura</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240309120000<TRNAMT>-8.50<MEMO>Drogaria Sao Paulo</STMTTRN>
+</BANKTRANLIST></OFX>"""
+
+
+@pytest.fixture
+def transacoes(pasta, monkeypatch):
+    """Conjunto de transações vazio e a IA apontada para o simulador local."""
+    servidor = simulador_groq.iniciar()
+    monkeypatch.setenv('GROQ_BASE_URL', f"http://127.0.0.1:{servidor.server_port}")
+    monkeypatch.setattr(categorizacao, '_cache', None)
+    monkeypatch.setattr(categorizacao, '_classificador', categorizacao.ClassificadorLocal())
+    monkeypatch.setattr(categorizacao, '_estatisticas', categorizacao.Estatisticas())
+    monkeypatch.setattr(categorizacao, '_clientes', {})
+    monkeypatch.setattr(categorizacao, 'TAMANHO_LOTE_IA', 2)
+    monkeypatch.setattr(compartilhado, '_conjuntos', {})
+    yield compartilhado.obter('transacoes')
+    servidor.shutdown()
+
+def requisicoes_ia(): return categorizacao.estatisticas()['falhas']  # descrições que precisaram da IA, uma por requisição
+
+
+def test_importa_csv_e_ofx_pelo_simulador_sem_duplicar(transacoes):
+    gravadas, resumo = importar_extrato(transacoes, CSV.encode('utf-8'), 'extrato.csv', 'chave-teste')
+    assert resumo == {'lidas': 5, 'descartadas': 2, 'duplicadas': 0, 'importadas': 3, 'lotes_com_falha': 0}
+    assert gravadas['Valor'].tolist() == [23.90, 1234.56, 1234.56]
+    assert gravadas['Tipo'].tolist() == ['Despesa', 'Despesa', 'Receita']
+    assert gravadas['Categoria'].tolist() == ['Transporte', 'Alimentação', 'Salário']
+    assert requisicoes_ia() == 2  # 3 descrições novas em lotes de 2
+
+    gravadas, resumo = importar_extrato(transacoes, OFX, 'extrato.ofx', 'chave-teste')
+    assert resumo == {'lidas': 3, 'descartadas': 0, 'duplicadas': 1, 'importadas': 2, 'lotes_com_falha': 0}
+    assert gravadas['Descrição'].tolist() == ['Netflix Assinatura', 'Drogaria Sao Paulo']
+    assert gravadas['Categoria'].tolist() == ['Lazer', 'Saúde']
+    assert requisicoes_ia() == 3
+
+    _, resumo = importar_extrato(transacoes, CSV.encode('utf-8'), 'extrato.csv', 'chave-teste')
+    assert resumo['duplicadas'] == 3 and resumo['importadas'] == 0
+    assert requisicoes_ia() == 3  # nada novo: nenhuma requisição
+    assert len(transacoes.vista()[0]) == 5
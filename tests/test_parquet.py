@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import armazenamento
+from conftest import aguardar_compactacao, recarregar
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+@pytest.fixture
+def parquet(pasta, monkeypatch):
+    monkeypatch.setattr(armazenamento, 'FORMATO', 'parquet')
+    monkeypatch.setattr(armazenamento, 'LIMITE_COMPACTACAO', 20)
+    return pasta
+
+def transacoes(n, inicio=0):
+    return pd.DataFrame([[datetime(2024, 3, 1 + i % 28, 12), f'Compra {i}', i + 0.5, 'Despesa', 'Lazer', 'Geral', ''] for i in range(inicio, inicio + n)],
+                        columns=armazenamento.COLUNAS_TRANSACOES)
+
+def inserir(df, n, inicio=0):
+    for i in range(inicio, inicio + n): df = armazenamento.inserir_registros(df, transacoes(1, i), 'transacoes.csv')
+    return df
+
+
+def test_migracao_e_compactacao_mantem_os_tipos(parquet):
+    transacoes(5).to_csv('transacoes.csv', index=False)
+    df = inserir(armazenamento.carregar_transacoes(), 50, 5)
+    aguardar_compactacao()
+    diario = armazenamento.obter_diario('transacoes.csv')
+    assert sum(1 for _ in open(diario.caminho_diario)) <= armazenamento.LIMITE_COMPACTACAO  # o diário foi compactado
+    assert pd.api.types.is_datetime64_any_dtype(pq.read_schema('transacoes.parquet').field('Data/Hora').type.to_pandas_dtype())
+    relido = recarregar(armazenamento.carregar_transacoes)
+    assert relido.index.tolist() == df.index.tolist() == list(range(55))
+    assert relido['Valor'].tolist() == df['Valor'].tolist()
+    assert (relido['Data/Hora'] == df['Data/Hora']).all()
+
+def test_compactacao_a_partir_de_base_vazia(parquet):
+    inserir(armazenamento.carregar_transacoes(), 25)
+    armazenamento.obter_diario('transacoes.csv').compactar()
+    esquema = pq.read_schema('transacoes.parquet')
+    assert pd.api.types.is_datetime64_any_dtype(esquema.field('Data/Hora').type.to_pandas_dtype())
+    assert recarregar(armazenamento.carregar_transacoes)['Valor'].tolist() == [i + 0.5 for i in range(25)]
+
+def test_falha_na_compactacao_nao_dispara_uma_thread_por_gravacao(parquet, monkeypatch):
+    df = armazenamento.carregar_transacoes()
+    diario = armazenamento.obter_diario('transacoes.csv')
+    tentativas = []
+    def falhar(df, destino): tentativas.append(destino); raise OSError("disco cheio")
+    monkeypatch.setattr(diario._snapshot, 'gravar', falhar)
+    df = inserir(df, 30)
+    aguardar_compactacao()
+    assert len(tentativas) == 1
+    df = inserir(df, 20, 30)  # 50 registros: passou de 20 + 20 desde a falha
+    aguardar_compactacao()
+    assert len(tentativas) == 2
+    assert recarregar(armazenamento.carregar_transacoes).index.tolist() == list(range(50))